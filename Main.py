@@ -1,13 +1,30 @@
 """主程序入口 - 简化版"""
 import sys
-from datetime import datetime
+import time
+import logging
+import argparse
+from functools import cached_property
 import os
 from config.setting import setup_environment
-from crawler.crawler_manager import CrawlerManager
-from analyzer.analysis_manager import AnalysisManager
-from report.report_manager import ReportManager
 from utils.logger import setup_logger
-from utils.cache_manager import CacheManager
+
+
+DEFAULT_EXCEL_FILE = "利率债市场观点建模.xlsx"
+
+# 日志和菜单中的分隔线
+_SEP_EQ = "=" * 80
+_SEP_DASH = "-" * 80
+
+# 运行模式菜单（整段预先拼好，一次输出）
+_MODE_MENU = "\n".join([
+    "\n" + _SEP_EQ,
+    "债券市场观点自动化分析系统 - AI增强版",
+    _SEP_EQ,
+    "\n请选择运行模式:",
+    "1. 爬取公众号模式 - 从33个公众号爬取最新文章并分析",
+    "2. Excel链接模式 - 分析Excel文件中提供的文章链接",
+    "\n" + _SEP_DASH
+])
 
 
 class BondMarketAnalysisSystem:
@@ -19,59 +36,78 @@ class BondMarketAnalysisSystem:
 
         # 然后初始化日志
         self.logger = setup_logger("BondAnalyzer")
-        self.logger.info("=" * 80)
+        self.logger.info(_SEP_EQ)
         self.logger.info("初始化债券市场分析系统 - AI增强版")
-        self.logger.info("=" * 80)
+        self.logger.info(_SEP_EQ)
 
         try:
-            # 初始化各个管理器
-            self.cache_manager = CacheManager()
-            self.crawler_manager = CrawlerManager()
-            self.analysis_manager = AnalysisManager()
-            self.report_manager = ReportManager()
-
-            # 清理旧缓存
-            self.cache_manager.clean_old_cache(days_to_keep=7)
+            # 各管理器按运行模式延迟加载；清理旧缓存只需文件操作，无需初始化缓存管理器
+            from utils.file_handler import FileHandler
+            FileHandler.clean_old_cache(days_to_keep=7)
+            self.logger.info("已清理7天前的缓存文件")
 
-            self.logger.info("=" * 80)
+            self.logger.info(_SEP_EQ)
             self.logger.info("所有组件初始化成功！")
-            self.logger.info("=" * 80)
+            self.logger.info(_SEP_EQ)
 
         except Exception as e:
             self.logger.error(f"初始化失败: {e}")
             raise
 
-    def run(self, mode: str = None):
-        """运行分析系统"""
-        start_time = datetime.now()
+    @cached_property
+    def cache_manager(self):
+        """延迟加载缓存管理器（Excel模式不需要打开文章索引）"""
+        from utils.cache_manager import CacheManager
+        return CacheManager()
+
+    @cached_property
+    def crawler_manager(self):
+        """延迟加载爬虫管理器（Excel模式不需要初始化爬虫）"""
+        from crawler.crawler_manager import CrawlerManager
+        return CrawlerManager()
+
+    @cached_property
+    def analysis_manager(self):
+        """延迟加载分析管理器"""
+        from analyzer.analysis_manager import AnalysisManager
+        return AnalysisManager()
+
+    @cached_property
+    def report_manager(self):
+        """延迟加载报告管理器"""
+        from report.report_manager import ReportManager
+        return ReportManager()
+
+    def run(self, args: argparse.Namespace = None):
+        """运行分析系统（args为None或未提供任何参数时交互选择）"""
+        start_time = time.perf_counter()
+        args = args or parse_args([])
 
         # 选择运行模式
+        mode = args.mode
         if not mode:
             mode = self._select_mode()
 
-        if mode == 'crawl':
-            self._run_crawl_mode()
-        elif mode == 'excel':
-            self._run_excel_mode()
+        # 命令行指定的抓取间隔覆盖配置
+        if args.min_delay is not None:
+            self.analysis_manager.rate_limiter.min_interval = args.min_delay
+
+        run_mode = {'crawl': self._run_crawl_mode, 'excel': self._run_excel_mode}.get(mode)
+        if run_mode:
+            run_mode(args)
         else:
             self.logger.error("无效的运行模式")
             return
 
         # 计算运行时间
-        duration = (datetime.now() - start_time).total_seconds()
-        self.logger.info(f"\n{'=' * 80}")
+        duration = time.perf_counter() - start_time
+        self.logger.info(f"\n{_SEP_EQ}")
         self.logger.info(f"分析完成！总耗时: {duration:.2f} 秒 ({duration / 60:.1f} 分钟)")
-        self.logger.info(f"{'=' * 80}")
+        self.logger.info(_SEP_EQ)
 
     def _select_mode(self) -> str:
         """选择运行模式"""
-        print("\n" + "=" * 80)
-        print("债券市场观点自动化分析系统 - AI增强版")
-        print("=" * 80)
-        print("\n请选择运行模式:")
-        print("1. 爬取公众号模式 - 从33个公众号爬取最新文章并分析")
-        print("2. Excel链接模式 - 分析Excel文件中提供的文章链接")
-        print("\n" + "-" * 80)
+        print(_MODE_MENU)
 
         while True:
             choice = input("\n请选择 (1/2): ")
@@ -82,60 +118,22 @@ class BondMarketAnalysisSystem:
             else:
                 print("无效选择，请重新输入")
 
-    def _run_crawl_mode(self):
+    def _confirm(self, args: argparse.Namespace) -> bool:
+        """询问用户是否继续，非交互运行时默认继续"""
+        if not args.interactive:
+            return True
+        return input("请选择 (y/n): ").lower() == 'y'
+
+    def _run_crawl_mode(self, args: argparse.Namespace):
         """运行爬取公众号模式"""
         self.logger.info("\n运行模式: 爬取公众号")
 
         # 爬取文章（只负责爬取，不负责筛选）
-        new_articles = self.crawler_manager.crawl_articles()
-
-        articles_to_analyze = []
-
-        # 无论是否有新文章，都询问用户
-        if new_articles:
-            self.logger.info(f"发现 {len(new_articles)} 篇新文章")
-            print(f"\n发现 {len(new_articles)} 篇新文章。")
-            print("是否立即分析这些新文章？")
-            choice = input("请选择 (y/n): ")
+        new_articles = self.crawler_manager.crawl_articles(
+            days=args.days, only_today=args.only_today, force_crawl=args.force
+        )
 
-            if choice.lower() == 'y':
-                articles_to_analyze = self.cache_manager._select_articles_for_analysis(new_articles)
-            else:
-                print("\n是否要分析今天所有的缓存文章（包括之前爬取的）？")
-                choice2 = input("请选择 (y/n): ")
-                if choice2.lower() == 'y':
-                    articles_to_analyze = self.cache_manager.get_today_articles_for_analysis()
-        else:
-            self.logger.warning("没有新文章需要分析")
-
-            # 检查今天的缓存
-            today_folder = datetime.now().strftime('%Y%m%d')
-            cache_path = os.path.join('data', 'cache', today_folder)
-
-            if os.path.exists(cache_path):
-                # 统计今天的缓存文章数
-                total_cached = 0
-                for type_folder in ['固收类', '权益类', '宏观类', '其他']:
-                    type_path = os.path.join(cache_path, type_folder)
-                    if os.path.exists(type_path):
-                        total_cached += len([f for f in os.listdir(type_path) if f.endswith('.txt')])
-
-                if total_cached > 0:
-                    print(f"\n没有发现新文章，但今天的缓存中有 {total_cached} 篇文章。")
-                    print("是否要分析今天的缓存文章？")
-                    choice = input("请选择 (y/n): ")
-
-                    if choice.lower() == 'y':
-                        articles_to_analyze = self.cache_manager.get_today_articles_for_analysis()
-                        if not articles_to_analyze:
-                            self.logger.info("没有可分析的缓存文章")
-                            return
-                else:
-                    print("\n今天没有任何缓存文章。")
-                    return
-            else:
-                print("\n今天没有缓存文件夹。")
-                return
+        articles_to_analyze = self._resolve_articles_to_analyze(args, new_articles)
 
         # 分析文章 - 只保留一次！
         if articles_to_analyze:
@@ -149,14 +147,54 @@ class BondMarketAnalysisSystem:
                 self.logger.warning("分析结果为空，无法生成报告")
         else:
             self.logger.info("没有选择要分析的文章")
-    def _run_excel_mode(self):
+
+    def _resolve_articles_to_analyze(self, args: argparse.Namespace, new_articles: list) -> list:
+        """确定要分析的文章：优先新文章，否则询问是否分析今天的缓存文章"""
+        # 无论是否有新文章，都询问用户
+        if new_articles:
+            self.logger.info(f"发现 {len(new_articles)} 篇新文章")
+            print(f"\n发现 {len(new_articles)} 篇新文章。")
+            print("是否立即分析这些新文章？")
+
+            if self._confirm(args):
+                return self.cache_manager._select_articles_for_analysis(new_articles, args.filter)
+
+            print("\n是否要分析今天所有的缓存文章（包括之前爬取的）？")
+            if self._confirm(args):
+                return self.cache_manager.get_today_articles_for_analysis(args.filter)
+            return []
+
+        self.logger.warning("没有新文章需要分析")
+
+        # 检查今天的缓存
+        today_folder = self.cache_manager.file_handler.today_folder()
+        if not os.path.exists(os.path.join('data', 'cache', today_folder)):
+            print("\n今天没有缓存文件夹。")
+            return []
+
+        # 统计今天的缓存文章数（列出的文件在分析时复用，不再重复遍历）
+        cached_files = self.cache_manager.list_today_cached_files()
+        total_cached = sum(len(files) for files in cached_files.values())
+        if total_cached == 0:
+            print("\n今天没有任何缓存文章。")
+            return []
+
+        print(f"\n没有发现新文章，但今天的缓存中有 {total_cached} 篇文章。")
+        print("是否要分析今天的缓存文章？")
+        if self._confirm(args):
+            return self.cache_manager.get_today_articles_for_analysis(args.filter, cached_files)
+        return []
+
+    def _run_excel_mode(self, args: argparse.Namespace):
         """运行Excel链接模式"""
         self.logger.info("\n运行模式: Excel链接分析")
 
         # 获取Excel文件名
-        excel_file = input("\n请输入Excel文件名（默认: 利率债市场观点建模.xlsx）: ")
+        excel_file = args.excel
+        if excel_file is None:
+            excel_file = input(f"\n请输入Excel文件名（默认: {DEFAULT_EXCEL_FILE}）: ")
         if not excel_file:
-            excel_file = "利率债市场观点建模.xlsx"
+            excel_file = DEFAULT_EXCEL_FILE
 
         # 分析Excel中的链接
         analyses = self.analysis_manager.analyze_from_excel(excel_file)
@@ -166,34 +204,97 @@ class BondMarketAnalysisSystem:
             self.report_manager.generate_reports(analyses)
 
 
+def _add_common_options(parser: argparse.ArgumentParser, default=None):
+    """添加爬取/分析选项（子命令中默认值为SUPPRESS，避免覆盖子命令之前给出的同名选项）"""
+    # --days 与 --only-today 互斥，同时给出时报错，不会静默忽略其中一个
+    days_group = parser.add_mutually_exclusive_group()
+    days_group.add_argument('--days', type=int, default=default,
+                            help="爬取最近N天的文章（不能与 --only-today 同时使用）")
+    days_group.add_argument('--only-today', action='store_true', default=default,
+                            help="只爬取今日文章（即 --days 1，不能与 --days 同时使用）")
+    parser.add_argument('--force', action='store_true', default=default, help="强制重新爬取已处理的文章")
+    parser.add_argument('--filter', choices=['bond_only', 'bond_macro', 'all'], default=default,
+                        help="分析的文章范围")
+    parser.add_argument('--min-delay', type=float, default=default, metavar='SECONDS',
+                        help="同一域名两次抓取的最小间隔秒数（默认取配置REQUEST_MIN_INTERVAL）")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器（支持 crawl / excel [PATH] 子命令，以及等价的 --crawl / --excel 选项）"""
+    parser = argparse.ArgumentParser(description="债券市场观点自动化分析系统")
+    parser.add_argument('--mode', choices=['crawl', 'excel'], help="运行模式")
+    parser.add_argument('--crawl', dest='mode', action='store_const', const='crawl',
+                        help="爬取公众号模式（同 --mode crawl）")
+    parser.add_argument('--excel', nargs='?', const=DEFAULT_EXCEL_FILE, metavar='PATH',
+                        help=f"Excel链接模式，可指定input目录下的文件名（默认: {DEFAULT_EXCEL_FILE}）")
+    _add_common_options(parser)
+
+    subparsers = parser.add_subparsers(dest='command', metavar='{crawl,excel}')
+    crawl_parser = subparsers.add_parser('crawl', help="爬取公众号模式")
+    _add_common_options(crawl_parser, default=argparse.SUPPRESS)
+    excel_parser = subparsers.add_parser('excel', help="Excel链接模式")
+    excel_parser.add_argument('file', nargs='?', metavar='PATH',
+                              help=f"input目录下的Excel文件名（默认: {DEFAULT_EXCEL_FILE}）")
+    _add_common_options(excel_parser, default=argparse.SUPPRESS)
+    return parser
+
+
+# 参数解析器只构建一次，重复调用parse_args（如定时任务）时复用
+_PARSER = _build_parser()
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """解析命令行参数
+
+    未提供任何参数且在终端中运行时为交互模式；否则未指定的选项使用默认值，不再询问。
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    args = _PARSER.parse_args(argv)
+
+    # 分别写在子命令前后时argparse的互斥组检查不到，这里补充检查
+    if args.only_today and args.days is not None:
+        _PARSER.error("--days 与 --only-today 不能同时使用")
+
+    # 子命令与 --mode/--excel 选项等价
+    if args.command:
+        args.mode = args.command
+        args.excel = getattr(args, 'file', None) or args.excel
+
+    if args.excel and not args.mode:
+        args.mode = 'excel'
+
+    args.interactive = not argv and sys.stdin.isatty()
+
+    # 非交互运行时补全默认值
+    if not args.interactive:
+        args.mode = args.mode or 'crawl'
+        if args.only_today is None:
+            args.only_today = args.days is None
+        if args.only_today:
+            args.days = 1
+        args.days = args.days or 7
+        args.force = bool(args.force)
+        args.filter = args.filter or 'bond_only'
+        args.excel = args.excel or DEFAULT_EXCEL_FILE
+
+    return args
+
+
 def main():
     """主函数"""
     try:
+        args = parse_args()
+
         print("\n正在启动债券市场分析系统...")
         system = BondMarketAnalysisSystem()
-
-        # 检查命令行参数
-        if len(sys.argv) > 1:
-            if sys.argv[1] == '--crawl':
-                system.run(mode='crawl')
-            elif sys.argv[1] == '--excel':
-                system.run(mode='excel')
-            elif sys.argv[1] == '--help':
-                print("\n使用方法:")
-                print("  python Main.py              # 交互式选择模式")
-                print("  python Main.py --crawl      # 爬取公众号模式")
-                print("  python Main.py --excel      # Excel链接模式")
-            else:
-                print(f"未知参数: {sys.argv[1]}")
-        else:
-            system.run()
+        system.run(args)
 
     except KeyboardInterrupt:
         print("\n\n程序被用户中断")
     except Exception as e:
-        print(f"\n程序运行出错: {e}")
-        import traceback
-        traceback.print_exc()
+        # 写入已配置的日志文件和控制台（日志尚未初始化时输出到stderr），附带完整堆栈
+        logging.getLogger("BondAnalyzer").exception(f"程序运行出错: {e}")
 
 
 if __name__ == "__main__":
@@ -1,16 +1,29 @@
 """分析管理器 - 统一管理所有分析功能"""
 import os
-import time
+import threading
 import pandas as pd
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional
 from datetime import datetime
 from .article_analyzer import ArticleAnalyzer
 from .market_analyzer import MarketAnalyzer
 from api.deepseek_client import DeepSeekClient
-from crawler.crawler_manager import CrawlerManager
 from utils.logger import setup_logger
 from utils.data_processor import DataProcessor
 from utils.file_handler import FileHandler
+from utils.rate_limiter import RateLimiter
+from utils.analysis_cache import AnalysisCache
+from config.setting import ANALYSIS_MAX_WORKERS, REQUEST_MIN_INTERVAL, ANALYSIS_CACHE_TTL_DAYS
+
+
+# 有效分析结果必须包含的字段
+_REQUIRED_FIELDS = frozenset([
+    '机构', '日期', 'url',
+    '基本面及通胀', '资金面',
+    '货币及财政政策', '机构行为',
+    '海外及其他', '整体观点',
+    '10Y国债态度', '5Y国债态度'
+])
 
 
 class AnalysisManager:
@@ -23,7 +36,19 @@ class AnalysisManager:
         self.market_analyzer = MarketAnalyzer(self.deepseek_client)
         self.data_processor = DataProcessor(deepseek_client=self.deepseek_client)
         self.file_handler = FileHandler()
-        self.crawler_manager = CrawlerManager()
+        self._crawler_manager = None  # 延迟加载
+        self._crawler_lock = threading.Lock()
+        self.rate_limiter = RateLimiter(REQUEST_MIN_INTERVAL)
+        self.analysis_cache = AnalysisCache(ttl_days=ANALYSIS_CACHE_TTL_DAYS)
+
+    @property
+    def crawler_manager(self):
+        """延迟加载爬虫管理器（仅在需要爬取内容时初始化，分析线程共享同一实例）"""
+        with self._crawler_lock:
+            if self._crawler_manager is None:
+                from crawler.crawler_manager import CrawlerManager
+                self._crawler_manager = CrawlerManager()
+        return self._crawler_manager
 
     def analyze_articles(self, articles: List[Dict]) -> List[Dict]:
         """分析文章列表"""
@@ -34,20 +59,12 @@ class AnalysisManager:
         estimated_time = len(articles) * 60
         self.logger.info(f"预计分析时间：约{estimated_time // 60}分钟")
 
-        # 创建临时Excel文件
-        temp_filename = self._create_temp_excel(articles)
+        # 直接在内存中组织分析数据，不再经过临时Excel文件
+        records = self._build_analysis_records(articles)
 
         try:
             # 运行分析
-            analyses = self._run_analysis(temp_filename, include_read_count=True)
-
-            # 清理临时文件
-            temp_path = os.path.join('data', 'input', temp_filename)
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-                self.logger.info("临时文件已清理")
-
-            return analyses
+            return self._run_analysis(records=records, include_read_count=True)
 
         except Exception as e:
             self.logger.error(f"分析文章失败: {e}")
@@ -57,9 +74,10 @@ class AnalysisManager:
         """从Excel文件分析"""
         return self._run_analysis(excel_file)
 
-    def _create_temp_excel(self, articles: List[Dict]) -> str:
-        """创建临时Excel文件"""
-        excel_data = []
+    def _build_analysis_records(self, articles: List[Dict]) -> List[Dict]:
+        """将文章列表整理为与Excel输入相同字段的分析记录"""
+        records = []
+        today = datetime.now().strftime('%Y-%m-%d')
 
         for i, article in enumerate(articles):
             # 确保link字段存在且不为空
@@ -69,52 +87,49 @@ class AnalysisManager:
                 link = f"cached://article_{i}_{article.get('title', 'unknown')[:20]}"
                 self.logger.warning(f"文章缺少链接，使用虚拟链接: {link}")
 
-            excel_data.append({
+            records.append({
                 '链接': link,
                 '撰写机构': article.get('institution', '未知'),
-                '发布日期': article.get('date', datetime.now().strftime('%Y-%m-%d')),
+                '发布日期': article.get('date', today),
                 '文章内容': article.get('content', ''),
                 '阅读数': article.get('read_num', 0),
-                '文章类型': article.get('article_type', '未分类'),
+                '文章类型': article.get('article_type'),
                 '文章标题': article.get('title', '未知标题')
             })
 
-        # 确保至少有一条数据
-        if not excel_data:
-            self.logger.error("没有有效的文章数据")
-            raise ValueError("没有可分析的文章")
-
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        temp_filename = f'crawled_articles_{timestamp}.xlsx'
-        temp_path = os.path.join('data', 'input', temp_filename)
-
-        os.makedirs(os.path.dirname(temp_path), exist_ok=True)
-
-        df = pd.DataFrame(excel_data)
-
-        # 调试：打印DataFrame信息
-        self.logger.debug(f"DataFrame columns: {df.columns.tolist()}")
-        self.logger.debug(f"DataFrame shape: {df.shape}")
-        self.logger.debug(f"First row link: {df.iloc[0]['链接'] if len(df) > 0 else 'No data'}")
-
-        df.to_excel(temp_path, index=False)
-
-        self.logger.info(f"创建临时分析文件: {temp_filename}")
-
-        return temp_filename
-
-    def _run_analysis(self, excel_file: str, include_read_count: bool = False) -> List[Dict]:
-        """运行分析流程 - 简化版"""
-        # 读取Excel数据
-        try:
-            links, institutions, dates, pre_contents = self.file_handler.read_excel_links(excel_file)
+        self.logger.info(f"整理分析数据: {len(records)} 篇文章")
+
+        return records
+
+    def _run_analysis(self, excel_file: str = None, *, records: List[Dict] = None,
+                      include_read_count: bool = False) -> List[Dict]:
+        """运行分析流程 - 简化版
+
+        Args:
+            excel_file: input目录下的Excel文件名
+            records: 已在内存中的分析记录（字段同Excel），提供时不读取文件
+            include_read_count: 是否包含阅读数
+        """
+        if records is not None:
+            links = [r['链接'] for r in records]
+            institutions = [r['撰写机构'] for r in records]
+            dates = [r['发布日期'] for r in records]
+            pre_contents = [r['文章内容'] for r in records]
+            titles = [r['文章标题'] for r in records]
+            article_types = [r['文章类型'] for r in records]
+        else:
+            # 读取Excel数据
+            try:
+                # 链接、标题等各列一次读取，不再为标题单独读取文件
+                links, institutions, dates, pre_contents, titles = \
+                    self.file_handler.read_excel_links(excel_file)
 
-            # 读取标题（不再需要阅读数）
-            titles = self._read_titles(excel_file)
+                # Excel中的文章没有分类，获取内容时再分类
+                article_types = [None] * len(links)
 
-        except Exception as e:
-            self.logger.error(f"读取文件失败: {e}")
-            return []
+            except Exception as e:
+                self.logger.error(f"读取文件失败: {e}")
+                return []
 
         if not links:
             self.logger.error("未找到任何链接")
@@ -122,55 +137,26 @@ class AnalysisManager:
 
         self.logger.info(f"读取到 {len(links)} 个链接")
 
-        # 分析文章
-        all_analyses = []
-        successful_count = 0
-        failed_count = 0
-
-        for i, (link, inst, date_str, pre_content, title) in enumerate(
-                zip(links, institutions, dates, pre_contents, titles), 1
-        ):
-            self.logger.info(f"\n{'=' * 60}")
-            self.logger.info(f"[{i}/{len(links)}] 开始分析")
-            self.logger.info(f"机构: {inst}")
-            self.logger.info(f"日期: {self.data_processor.parse_date(date_str)}")
-            self.logger.info(f"链接: {link}")
-
-            if title:
-                self.logger.info(f"标题: {title}")
-
-            try:
-                # 获取内容
-                content = self._get_article_content(link, inst, date_str, title, pre_content)
-
-                if not content or len(content) < 100:
-                    self.logger.warning("文章内容过短或为空，跳过")
-                    failed_count += 1
-                    continue
-
-                # 清理内容
-                content = self.data_processor.clean_text(content)
-
-                # 分析文章（不再需要评分）
-                analysis = self.article_analyzer.analyze(content, link, inst, str(date_str))
+        # 并发分析文章（网络请求和API调用均为IO等待，按域名限速）
+        total = len(links)
+        results = {}
 
-                # 验证分析结果
-                if self._validate_analysis(analysis):
-                    all_analyses.append(analysis)
-                    successful_count += 1
-                    self.logger.info(f"分析完成 - 态度: {analysis.get('10Y国债态度')}")
-                else:
-                    self.logger.warning("分析结果验证失败")
-                    failed_count += 1
+        with ThreadPoolExecutor(max_workers=min(ANALYSIS_MAX_WORKERS, total)) as executor:
+            futures = {
+                executor.submit(self._process_one_article, i, total, link, inst,
+                                date_str, pre_content, title, article_type): i
+                for i, (link, inst, date_str, pre_content, title, article_type) in enumerate(
+                    zip(links, institutions, dates, pre_contents, titles, article_types), 1
+                )
+            }
 
-            except Exception as e:
-                self.logger.error(f"处理文章失败: {e}")
-                failed_count += 1
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
 
-            # 避免请求过快
-            if i < len(links):
-                self.logger.info("等待3秒后继续...")
-                time.sleep(3)
+        # 按原始顺序汇总结果
+        all_analyses = [results[i] for i in sorted(results) if results[i]]
+        successful_count = len(all_analyses)
+        failed_count = len(results) - successful_count
 
         # 输出统计
         self.logger.info(f"\n{'=' * 60}")
@@ -182,29 +168,57 @@ class AnalysisManager:
 
         return all_analyses
 
+    def _process_one_article(self, i: int, total: int, link: str, inst: str, date_str: str,
+                             pre_content: str, title: str,
+                             article_type: Optional[str] = None) -> Optional[Dict]:
+        """获取并分析单篇文章，失败时返回None"""
+        prefix = f"[{i}/{total}]"
+        self.logger.info(f"{prefix} 开始分析 - 机构: {inst}, "
+                         f"日期: {self.data_processor.parse_date(date_str)}")
+        self.logger.info(f"{prefix} 链接: {link}")
+
+        if title:
+            self.logger.info(f"{prefix} 标题: {title}")
+
+        try:
+            # 获取内容（只有需要联网爬取时才按域名限速）
+            content = self._get_article_content(link, inst, date_str, title, pre_content, article_type)
+
+            if not content or len(content) < 100:
+                self.logger.warning(f"{prefix} 文章内容过短或为空，跳过")
+                return None
+
+            # 清理内容
+            content = self.data_processor.clean_text(content)
+
+            # 相同内容已分析过则直接复用结果
+            content_hash = self.analysis_cache.content_hash(content)
+            cached = self.analysis_cache.get(content_hash)
+            if cached is not None:
+                cached.update({'url': link, '机构': inst, '日期': str(date_str)})
+                self.logger.info(f"{prefix} 使用缓存的分析结果 - 态度: {cached.get('10Y国债态度')}")
+                return cached
+
+            # 分析文章（不再需要评分）
+            analysis = self.article_analyzer.analyze(content, link, inst, str(date_str))
+
+            # 验证分析结果
+            if self._validate_analysis(analysis):
+                self.logger.info(f"{prefix} 分析完成 - 态度: {analysis.get('10Y国债态度')}")
+                if analysis.get('整体观点') != '分析失败':
+                    self.analysis_cache.set(content_hash, analysis)
+                return analysis
+
+            self.logger.warning(f"{prefix} 分析结果验证失败")
+
+        except Exception as e:
+            self.logger.error(f"{prefix} 处理文章失败: {e}")
+
+        return None
+
     def _validate_analysis(self, analysis: Dict) -> bool:
         """验证分析结果 - 简化版"""
-        required_fields = [
-            '机构', '日期', 'url',
-            '基本面及通胀', '资金面',
-            '货币及财政政策', '机构行为',
-            '海外及其他', '整体观点',
-            '10Y国债态度', '5Y国债态度'
-        ]
-
-        for field in required_fields:
-            if field not in analysis:
-                return False
-
-        return True
-
-    def _read_titles(self, excel_file: str) -> List[str]:
-        """读取文章标题"""
-        try:
-            df = pd.read_excel(os.path.join('data', 'input', excel_file))
-            return df['文章标题'].fillna('').tolist() if '文章标题' in df.columns else [''] * len(df)
-        except:
-            return []
+        return _REQUIRED_FIELDS.issubset(analysis)
 
     def _read_extra_info(self, excel_file: str) -> tuple:
         """读取额外信息（阅读数、标题）"""
@@ -219,12 +233,16 @@ class AnalysisManager:
             return [], []
 
     def _get_article_content(self, link: str, inst: str, date_str: str,
-                             title: str, pre_content: str) -> str:
+                             title: str, pre_content: str, article_type: Optional[str] = None) -> str:
         """获取文章内容"""
-        # 优先使用预存内容
-        if pre_content and str(pre_content) != 'nan' and len(str(pre_content)) > 100:
+        # 优先使用预存内容（Excel空单元格读出为NaN，用pd.isna判断，字符串无需再转换）
+        if not isinstance(pre_content, str):
+            pre_content = '' if pre_content is None or pd.isna(pre_content) else str(pre_content)
+        if len(pre_content) > 100:
             self.logger.info("使用Excel中预存的文章内容")
-            return str(pre_content)
+            return pre_content
 
         # 否则爬取内容
-        return self.crawler_manager.fetch_article_content(link, inst, date_str, title)
+        return self.crawler_manager.fetch_article_content(
+            link, inst, date_str, title, article_type, rate_limiter=self.rate_limiter
+        )
@@ -1,5 +1,7 @@
 """市场综合分析器"""
+import heapq
 import json
+from collections import Counter
 from typing import List, Dict, Any
 from api.deepseek_client import DeepSeekClient
 from analyzer.prompt import SUMMARY_REPORT_PROMPT
@@ -15,11 +17,11 @@ class MarketAnalyzer:
 
     def generate_summary(self, analyses: List[Dict[str, Any]]) -> str:
         """生成市场总结报告"""
-        # 按重要性排序
-        sorted_analyses = sorted(analyses, key=lambda x: x.get('重要性评分', 0), reverse=True)
+        # 按重要性取前5篇（只保留前5，无需整体排序）
+        top_analyses = heapq.nlargest(5, analyses, key=lambda x: x.get('重要性评分', 0))
 
         # 整理详细观点
-        detailed_views = self._extract_detailed_views(sorted_analyses[:5])
+        detailed_views = self._extract_detailed_views(top_analyses)
 
         # 统计文章类型
         article_types = self._count_article_types(analyses)
@@ -52,23 +54,19 @@ class MarketAnalyzer:
 
         for analysis in analyses:
             for dim in self.dimensions:
-                if analysis.get(dim) and len(analysis.get(dim, '')) > 20:
+                if (view := analysis.get(dim)) and len(view) > 20:
                     detailed_views[dim].append({
                         '机构': analysis.get('机构', ''),
-                        '观点': analysis.get(dim)
+                        '观点': view
                     })
 
         return detailed_views
 
     def _count_article_types(self, analyses: List[Dict[str, Any]]) -> Dict[str, int]:
         """统计文章类型"""
-        article_types = {}
-
-        for analysis in analyses:
-            for type_name in analysis.get('文章类型', []):
-                article_types[type_name] = article_types.get(type_name, 0) + 1
-
-        return article_types
+        return Counter(
+            type_name for analysis in analyses for type_name in analysis.get('文章类型', [])
+        )
 
     def _clean_format(self, text: str) -> str:
         """清理文本格式"""
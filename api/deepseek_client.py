@@ -16,7 +16,7 @@ class DeepSeekClient:
         self.logger = logging.getLogger(self.__class__.__name__)
 
     def chat(self, prompt: str, max_retries: int = 3) -> str:
-        """调用聊天API"""
+        """调用聊天API（多线程并发调用，失败后按指数退避重试，避免同时重试加剧限流）"""
         for attempt in range(max_retries):
             try:
                 self.logger.info(f"API调用尝试 {attempt + 1}/{max_retries}")
@@ -48,4 +48,4 @@ class DeepSeekClient:
                     self.logger.error("API调用最终失败")
                     return ""
                 else:
-                    time.sleep(3)
+                    time.sleep(3 * 2 ** attempt)
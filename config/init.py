@@ -13,7 +13,15 @@ from setting import (
     LOG_DIR,
 
     # 分析配置
-    ANALYSIS_DIMENSIONS
+    ANALYSIS_DIMENSIONS,
+    ARTICLE_TYPES,
+
+    # 并发配置
+    ANALYSIS_MAX_WORKERS,
+    REQUEST_MIN_INTERVAL,
+
+    # 分析缓存配置
+    ANALYSIS_CACHE_TTL_DAYS
 )
 
 __all__ = [
@@ -25,5 +33,9 @@ __all__ = [
     'OUTPUT_DIR',
     'CACHE_DIR',
     'LOG_DIR',
-    'ANALYSIS_DIMENSIONS'
+    'ANALYSIS_DIMENSIONS',
+    'ARTICLE_TYPES',
+    'ANALYSIS_MAX_WORKERS',
+    'REQUEST_MIN_INTERVAL',
+    'ANALYSIS_CACHE_TTL_DAYS'
 ]
\ No newline at end of file
@@ -22,6 +22,16 @@ ANALYSIS_DIMENSIONS = [
     "海外及其他"
 ]
 
+# 文章分类（缓存目录下按此顺序建立子文件夹）
+ARTICLE_TYPES = ('固收类', '权益类', '宏观类', '其他')
+
+# 并发配置
+ANALYSIS_MAX_WORKERS = 8  # 同时分析的文章数
+REQUEST_MIN_INTERVAL = 3  # 同一域名两次请求的最小间隔（秒）
+
+# 分析缓存配置
+ANALYSIS_CACHE_TTL_DAYS = 30  # 分析结果缓存有效期（天）
+
 def setup_environment():
     """设置环境"""
     # 创建必要的目录
@@ -2,6 +2,7 @@
 import os
 from datetime import datetime, date
 from typing import List, Dict
+import pandas as pd
 from .wechat_batch_crawler import WechatBatchCrawler
 from .wechat_crawler import WechatCrawler
 from .jina_crawler import JinaCrawler
@@ -21,19 +22,21 @@ class CrawlerManager:
         self.cache_manager = CacheManager()
         self.data_processor = DataProcessor()
 
-    def crawl_articles(self) -> List[Dict]:
-        """爬取文章的主入口"""
+    def crawl_articles(self, days: int = None, only_today: bool = None,
+                       force_crawl: bool = None) -> List[Dict]:
+        """爬取文章的主入口（参数为None时交互询问）"""
         # 加载公众号列表
         if not self.batch_crawler.load_accounts():
             self.logger.error("加载公众号列表失败")
             return []
 
         # 询问爬取选项
-        days, only_today = self._get_crawl_options()
+        if only_today is None:
+            days, only_today = self._get_crawl_options()
 
         # 开始爬取
         self.logger.info(f"开始爬取最近{days}天的文章...")
-        articles = self._crawl_with_dedup(days, only_today)
+        articles = self._crawl_with_dedup(days, only_today, force_crawl)
 
         # 显示缓存统计
         self.cache_manager.show_today_statistics()
@@ -57,63 +60,68 @@ class CrawlerManager:
             except:
                 return 7, False
 
-    def _crawl_with_dedup(self, days: int, only_today: bool) -> List[Dict]:
+    def _crawl_with_dedup(self, days: int, only_today: bool, force_crawl: bool = None) -> List[Dict]:
         """爬取并去重"""
         # 询问是否强制重新爬取
-        print("\n去重选项:")
-        print("1. 跳过已处理的文章（推荐）")
-        print("2. 强制重新爬取所有文章")
-        dedup_choice = input("请选择 (1/2，默认1): ").strip() or "1"
+        if force_crawl is None:
+            print("\n去重选项:")
+            print("1. 跳过已处理的文章（推荐）")
+            print("2. 强制重新爬取所有文章")
+            dedup_choice = input("请选择 (1/2，默认1): ").strip() or "1"
 
-        force_crawl = (dedup_choice == "2")
+            force_crawl = (dedup_choice == "2")
 
-        new_articles = []
         skipped_count = 0
 
         # 获取所有文章
         raw_articles = self.batch_crawler.crawl_all_accounts_with_return(days=days)
 
-        # 过滤和去重
-        today = date.today().isoformat()
-
-        for article in raw_articles:
-            # 如果只爬今天的，检查日期
-            if only_today:
-                article_date = self.data_processor.parse_date(article['date'])
-                if article_date != today:
-                    continue
-
-            # 检查是否已处理（除非强制爬取）
-            if not force_crawl and self.cache_manager.is_article_processed(
-                    article['title'],
-                    article['institution'],
-                    article['date']
-            ):
-                skipped_count += 1
-                continue
-
-            new_articles.append(article)
-
-            # 标记为已处理
-            self.cache_manager.mark_article_processed(
-                article['title'],
-                article['institution'],
-                article['date']
-            )
+        # 如果只爬今天的，按日期批量过滤
+        candidates = raw_articles
+        if only_today and raw_articles:
+            today = date.today().isoformat()
+            parsed_dates = self._parse_dates(pd.Series([a['date'] for a in raw_articles]))
+            candidates = [a for a, d in zip(raw_articles, parsed_dates) if d == today]
+
+        # 检查是否已处理（除非强制爬取），并批量标记为已处理
+        if force_crawl:
+            new_articles = candidates
+        else:
+            new_articles, skipped_count = self.cache_manager.split_processed_articles(candidates)
+
+        self.cache_manager.mark_articles_processed(new_articles)
 
         self.logger.info(f"文章统计: 总计{len(raw_articles)}篇，新文章{len(new_articles)}篇，跳过{skipped_count}篇")
 
         return new_articles
 
+    def _parse_dates(self, dates: pd.Series) -> pd.Series:
+        """批量标准化日期，非标准格式的日期再逐个解析"""
+        parsed = pd.to_datetime(dates, format='%Y-%m-%d', errors='coerce').dt.strftime('%Y-%m-%d')
+
+        unparsed = parsed.isna()
+        if unparsed.any():
+            parsed[unparsed] = dates[unparsed].map(self.data_processor.parse_date)
+
+        return parsed
+
     def fetch_article_content(self, url: str, institution: str = "",
-                              date: str = "", title: str = "") -> str:
-        """获取文章内容"""
+                              date: str = "", title: str = "", article_type: str = None,
+                              rate_limiter=None) -> str:
+        """获取文章内容（article_type为None时保存缓存前自动分类）
+
+        rate_limiter: 可选的限速器，仅在缓存未命中、需要发起网络请求时等待
+        """
         # 先检查缓存
         cached_content = self.cache_manager.get_cached_content(url)
         if cached_content:
             self.logger.info("使用缓存内容")
             return cached_content
 
+        # 避免对同一域名请求过快
+        if rate_limiter is not None:
+            rate_limiter.wait(url)
+
         # 获取新内容
         content = ""
         fetched_title = ""
@@ -132,7 +140,7 @@ class CrawlerManager:
                     title = fetched_title
 
                 self.cache_manager.save_article_with_auto_classify(
-                    url, institution, date, title, content
+                    url, institution, date, title, content, article_type
                 )
 
         except Exception as e:
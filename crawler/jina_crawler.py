@@ -1,5 +1,7 @@
 """Jina Reader爬虫"""
 import requests
+from requests.adapters import HTTPAdapter
+from config.setting import ANALYSIS_MAX_WORKERS
 from .base_crawler import BaseCrawler
 
 
@@ -11,6 +13,12 @@ class JinaCrawler(BaseCrawler):
         self.base_url = "https://r.jina.ai/"
         self.timeout = 30
 
+        # 复用连接：所有文章共用一个Session，每个主机只需一次TCP/TLS握手（连接池大小与分析线程数一致）
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=ANALYSIS_MAX_WORKERS, pool_maxsize=ANALYSIS_MAX_WORKERS)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
     def fetch_content(self, url: str) -> tuple[str, str]:
         """获取网页内容
 
@@ -26,7 +34,7 @@ class JinaCrawler(BaseCrawler):
             self.logger.info(f"使用Jina Reader获取: {jina_url}")
 
             # 发送请求
-            response = requests.get(jina_url, timeout=self.timeout)
+            response = self.session.get(jina_url, timeout=self.timeout)
             response.raise_for_status()
 
             # Jina Reader返回的是纯文本内容
@@ -24,6 +24,7 @@ class WechatBatchCrawler(WechatCrawler):
         self.accounts_info = {}
         self.search_url = "https://mp.weixin.qq.com/cgi-bin/searchbiz"
         self.article_list_url = "https://mp.weixin.qq.com/cgi-bin/appmsg"
+        self._fakeids_dirty = False  # 有新搜索到的fakeid尚未写盘
         # 使用统一的分类器
         self.article_classifier = ArticleClassifier()
 
@@ -71,7 +72,10 @@ class WechatBatchCrawler(WechatCrawler):
                 self.logger.error(f"加载fakeid失败: {e}")
 
     def _save_fakeids(self):
-        """保存fakeid"""
+        """保存fakeid（每轮爬取结束时统一写一次）"""
+        if not self._fakeids_dirty:
+            return
+
         cache_file = os.path.join(CACHE_DIR, 'accounts_fakeid.json')
         os.makedirs(os.path.dirname(cache_file), exist_ok=True)
 
@@ -81,8 +85,13 @@ class WechatBatchCrawler(WechatCrawler):
             if info['fakeid']
         }
 
-        with open(cache_file, 'w', encoding='utf-8') as f:
+        # 先写临时文件再替换，避免中断时留下半个文件
+        temp_file = cache_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
             json.dump(fakeids, f, ensure_ascii=False, indent=2)
+        os.replace(temp_file, cache_file)
+
+        self._fakeids_dirty = False
 
     def search_account(self, account_name: str) -> str:
         """搜索公众号获取fakeid"""
@@ -240,7 +249,7 @@ class WechatBatchCrawler(WechatCrawler):
             article_type = self.article_classifier.classify(
                 title=article_info['title'],
                 institution=account_info['撰写机构'],
-                content=content[:500],
+                content=content,
                 content_type=account_info['内容分类']
             )
 
@@ -323,6 +332,9 @@ class WechatBatchCrawler(WechatCrawler):
             except Exception as e:
                 self.logger.error(f"处理公众号 {account_name} 失败: {e}")
 
+        # 保存本轮新搜索到的fakeid
+        self._save_fakeids()
+
         # 输出统计
         self.logger.info(f"\n爬取完成统计:")
         self.logger.info(f"- 成功处理公众号: {success_count}/{total_accounts}")
@@ -370,6 +382,9 @@ class WechatBatchCrawler(WechatCrawler):
             except Exception as e:
                 self.logger.error(f"处理公众号 {account_name} 失败: {e}")
 
+        # 保存本轮新搜索到的fakeid
+        self._save_fakeids()
+
         # 输出统计
         self.logger.info(f"\n爬取完成统计:")
         self.logger.info(f"- 成功处理公众号: {success_count}/{total_accounts}")
@@ -385,7 +400,7 @@ class WechatBatchCrawler(WechatCrawler):
             if fakeid:
                 account_info['fakeid'] = fakeid
                 self.accounts_info[account_name]['fakeid'] = fakeid
-                self._save_fakeids()
+                self._fakeids_dirty = True
             else:
                 self.logger.warning(f"未找到公众号: {account_name}")
                 return ""
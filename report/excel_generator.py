@@ -1,11 +1,27 @@
 """Excel报告生成器 - 简化版"""
 import os
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Any
-from config.setting import OUTPUT_DIR
+from config.setting import OUTPUT_DIR, ANALYSIS_DIMENSIONS
 from utils.logger import setup_logger
 
+try:
+    import pyarrow  # noqa: F401  Arrow字符串列内存连续，.str操作更快
+    _STRING_DTYPE = 'string[pyarrow]'
+except ImportError:  # 未安装pyarrow时保持object类型
+    _STRING_DTYPE = object
+
+
+# 分析结果工作表的列（序号之后各列依次取自分析结果的字段，“发布日期”取自“日期”）
+_OPINION_FIELDS = ['10Y国债态度', '10Y预测区间', '5Y国债态度', '5Y预测区间', '整体观点']
+_MAIN_COLUMNS = ['序号', '机构', '发布日期', *ANALYSIS_DIMENSIONS, *_OPINION_FIELDS]
+
+# 取值重复度高的列（机构、态度）用分类类型存储
+_CATEGORY_COLUMNS = ('机构', '10Y国债态度', '5Y国债态度')
+
 
 class ExcelGenerator:
     """Excel报告生成器"""
@@ -19,17 +35,22 @@ class ExcelGenerator:
         try:
             excel_path = os.path.join(self.output_dir, f'债券市场分析结果_{timestamp}.xlsx')
 
-            # 准备数据
-            # 1. 主要分析结果
-            main_df = self._create_main_dataframe(analyses)
-
-            # 2. 态度统计
-            attitude_df = self._create_attitude_statistics_dataframe(analyses)
-
-            # 写入Excel
-            with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-                main_df.to_excel(writer, sheet_name='分析结果', index=False)
-                attitude_df.to_excel(writer, sheet_name='态度统计', index=False)
+            # 准备数据：各工作表的DataFrame互不依赖，并行构建
+            sheet_builders = {
+                '分析结果': self._create_main_dataframe,  # 1. 主要分析结果
+                '态度统计': self._create_attitude_statistics_dataframe  # 2. 态度统计
+            }
+            with ThreadPoolExecutor(max_workers=len(sheet_builders)) as executor:
+                futures = {name: executor.submit(builder, analyses)
+                           for name, builder in sheet_builders.items()}
+                sheets = {name: future.result() for name, future in futures.items()}
+
+            # 写入Excel（xlsxwriter只写不读，比openpyxl快；关闭URL识别省去逐个字符串扫描）
+            with pd.ExcelWriter(excel_path, engine='xlsxwriter',
+                                engine_kwargs={'options': {'strings_to_urls': False}}) as writer:
+                for sheet_name, df in sheets.items():
+                    df.to_excel(writer, sheet_name=sheet_name, index=False)
+                    self._set_column_widths(writer.sheets[sheet_name], df)
 
             return excel_path
 
@@ -37,79 +58,72 @@ class ExcelGenerator:
             self.logger.error(f"生成Excel报告失败: {e}")
             return ""
 
+    def _set_column_widths(self, worksheet, df: pd.DataFrame, max_width: int = 50):
+        """按列内容长度设置列宽（按列下标设置，不受A-Z列数限制）"""
+        text = df.astype(str)
+        content_widths = {col: text[col].str.len().max() for col in text.columns}
+
+        for col_idx, col in enumerate(df.columns):
+            width = max(content_widths[col] if pd.notna(content_widths[col]) else 0, len(str(col)))
+            worksheet.set_column(col_idx, col_idx, min(width + 2, max_width))
+
     def _create_main_dataframe(self, analyses):
         """创建主要分析结果DataFrame - 简化版"""
-        data = []
-
-        for i, analysis in enumerate(analyses, 1):
-            row = {
-                '序号': i,
-                '机构': analysis.get('机构', ''),
-                '发布日期': analysis.get('日期', ''),
-                '基本面及通胀': str(analysis.get('基本面及通胀', ''))[:300],
-                '资金面': str(analysis.get('资金面', ''))[:300],
-                '货币及财政政策': str(analysis.get('货币及财政政策', ''))[:300],
-                '机构行为': str(analysis.get('机构行为', ''))[:300],
-                '海外及其他': str(analysis.get('海外及其他', ''))[:300],
-                '10Y国债态度': analysis.get('10Y国债态度', ''),
-                '10Y预测区间': analysis.get('10Y预测区间', ''),
-                '5Y国债态度': analysis.get('5Y国债态度', ''),
-                '5Y预测区间': analysis.get('5Y预测区间', ''),
-                '整体观点': analysis.get('整体观点', '')
-            }
-            data.append(row)
-
-        return pd.DataFrame(data)
+        data = [
+            (i, analysis.get('机构', ''), analysis.get('日期', ''),
+             *(str(analysis.get(dim, '')) for dim in ANALYSIS_DIMENSIONS),
+             *(analysis.get(field, '') for field in _OPINION_FIELDS))
+            for i, analysis in enumerate(analyses, 1)
+        ]
+
+        # 按固定列顺序构建，无需逐行推断列名
+        df = pd.DataFrame.from_records(data, columns=_MAIN_COLUMNS).astype(
+            {'序号': 'int32', **{col: _STRING_DTYPE for col in _MAIN_COLUMNS[1:]},
+             **{col: 'category' for col in _CATEGORY_COLUMNS}}
+        )
+
+        # 各维度观点按列截取前300字
+        if not df.empty:
+            dims = list(ANALYSIS_DIMENSIONS)
+            df[dims] = df[dims].apply(lambda col: col.str.slice(0, 300))
+
+        return df
 
     def _create_attitude_statistics_dataframe(self, analyses):
         """创建态度统计DataFrame"""
-        # 统计各态度数量
-        stats = {
-            '10Y看多': 0, '10Y看空': 0, '10Y中性': 0,
-            '5Y看多': 0, '5Y看空': 0, '5Y中性': 0
-        }
-
-        institutions_by_attitude = {
-            '10Y看多': [], '10Y看空': [], '10Y中性': [],
-            '5Y看多': [], '5Y看空': [], '5Y中性': []
-        }
-
-        for analysis in analyses:
-            inst = analysis.get('机构', '')
-
-            # 10Y态度
-            attitude_10y = analysis.get('10Y国债态度', '')
-            if '多' in attitude_10y:
-                stats['10Y看多'] += 1
-                institutions_by_attitude['10Y看多'].append(inst)
-            elif '空' in attitude_10y:
-                stats['10Y看空'] += 1
-                institutions_by_attitude['10Y看空'].append(inst)
-            elif '中性' in attitude_10y or '震荡' in attitude_10y:
-                stats['10Y中性'] += 1
-                institutions_by_attitude['10Y中性'].append(inst)
-
-            # 5Y态度（类似处理）
-            attitude_5y = analysis.get('5Y国债态度', '')
-            if '多' in attitude_5y:
-                stats['5Y看多'] += 1
-                institutions_by_attitude['5Y看多'].append(inst)
-            elif '空' in attitude_5y:
-                stats['5Y看空'] += 1
-                institutions_by_attitude['5Y看空'].append(inst)
-            elif '中性' in attitude_5y or '震荡' in attitude_5y:
-                stats['5Y中性'] += 1
-                institutions_by_attitude['5Y中性'].append(inst)
+        categories = [f"{term}{label}" for term in ('10Y', '5Y') for label in ('看多', '看空', '中性')]
+
+        # 每篇文章的10Y/5Y态度展开为一行，统一判定态度类别（按列构建，只取用到的三个字段）
+        df = pd.DataFrame({
+            '机构': [analysis.get('机构') or '' for analysis in analyses],
+            '10Y国债态度': [analysis.get('10Y国债态度') for analysis in analyses],
+            '5Y国债态度': [analysis.get('5Y国债态度') for analysis in analyses]
+        })
+        long_df = df.melt(id_vars='机构', var_name='期限', value_name='态度')
+
+        attitude = long_df['态度'].fillna('').astype(str)
+        label = np.select(
+            [attitude.str.contains('多'), attitude.str.contains('空'),
+             attitude.str.contains('中性|震荡')],
+            ['看多', '看空', '中性'], default=''
+        )
+        long_df['类别'] = long_df['期限'].str.replace('国债态度', '') + label
+
+        # 按类别分组统计数量和前5家机构（组内保持文章顺序）
+        grouped = long_df[label != ''].groupby('类别', sort=False)['机构']
+        counts = grouped.size().reindex(categories, fill_value=0)
+        institutions = grouped.agg(lambda s: ', '.join(s.head(5))).reindex(categories, fill_value='')
+
+        # 没有分析结果时占比统一显示为0%
+        if analyses:
+            percentages = (counts * 100.0 / len(analyses)).map('{:.1f}%'.format)
+        else:
+            percentages = pd.Series('0%', index=counts.index)
 
         # 构建DataFrame
-        data = []
-        for key, count in stats.items():
-            data.append({
-                '类别': key,
-                '数量': count,
-                '占比': f"{count / len(analyses) * 100:.1f}%" if analyses else "0%",
-                '机构列表': ', '.join(institutions_by_attitude[key][:5]) +
-                            (f'等{count}家' if count > 5 else '')
-            })
-
-        return pd.DataFrame(data)
+        return pd.DataFrame({
+            '类别': categories,
+            '数量': counts.to_numpy(dtype='int32'),
+            '占比': percentages.to_numpy(),
+            '机构列表': (institutions + np.where(counts > 5, '等' + counts.astype(str) + '家', '')).to_numpy()
+        }).astype({'类别': _STRING_DTYPE, '占比': _STRING_DTYPE, '机构列表': _STRING_DTYPE})
@@ -13,6 +13,11 @@ from analyzer.prompt import SUMMARY_REPORT_PROMPT
 from config.setting import OUTPUT_DIR, ANALYSIS_DIMENSIONS
 
 
+# 日志/控制台分隔线
+_SEP_EQ = '=' * 80
+_NL_SEP_EQ = '\n' + _SEP_EQ
+
+
 class ReportManager:
     """报告管理器"""
 
@@ -31,17 +36,19 @@ class ReportManager:
             self.logger.error("没有可用的分析结果")
             return
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        # 本次生成的所有报告共用同一时间
+        now = datetime.now()
+        timestamp = now.strftime('%Y%m%d_%H%M%S')
 
-        self.logger.info(f"\n{'=' * 80}")
+        self.logger.info(_NL_SEP_EQ)
         self.logger.info("开始生成分析报告...")
-        self.logger.info(f"{'=' * 80}")
+        self.logger.info(_SEP_EQ)
 
         # 生成Excel报告
         self._generate_excel_report(analyses, timestamp)
 
         # 生成文本报告
-        self._generate_text_report(analyses, timestamp)
+        self._generate_text_report(analyses, timestamp, now.strftime('%Y-%m-%d %H:%M:%S'))
 
     def _generate_excel_report(self, analyses, timestamp):
         """生成Excel报告"""
@@ -57,11 +64,9 @@ class ReportManager:
                 self.logger.error("✗ Excel报告生成失败")
 
         except Exception as e:
-            self.logger.error(f"✗ 生成Excel失败: {e}")
-            import traceback
-            traceback.print_exc()
+            self.logger.exception(f"✗ 生成Excel失败: {e}")
 
-    def _generate_text_report(self, analyses, timestamp):
+    def _generate_text_report(self, analyses, timestamp, generated_at):
         """生成文本报告 - 新格式"""
         self.logger.info("\n生成市场观点内参...")
 
@@ -99,127 +104,42 @@ class ReportManager:
 
             with open(report_path, 'w', encoding='utf-8') as f:
                 f.write(f"债券市场观点内参\n")
-                f.write(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                f.write(f"生成时间: {generated_at}\n")
                 f.write(f"分析文章数: {len(analyses)}篇\n")
-                f.write("=" * 80 + "\n\n")
+                f.write(f"{_SEP_EQ}\n\n")
                 f.write(summary)
 
             self.logger.info(f"✓ 观点内参已生成: {report_path}")
 
             # 在控制台显示
-            print("\n" + "=" * 80)
+            print(_NL_SEP_EQ)
             print("【债券市场观点内参】")
-            print("=" * 80)
+            print(_SEP_EQ)
             print(summary)
-            print("=" * 80)
+            print(_SEP_EQ)
 
         except Exception as e:
-            self.logger.error(f"✗ 生成文本报告失败: {e}")
-            import traceback
-            traceback.print_exc()
-
-    def _generate_text_report(self, analyses, timestamp):
-        """生成文本报告 - 新格式"""
-        self.logger.info("\n生成市场观点内参...")
-
-        try:
-            # 统计态度
-            attitude_stats = self._calculate_attitude_statistics(analyses)
-
-            # 整理各维度观点
-            dimension_views = self._extract_dimension_views(analyses)
-
-            # 构建提示词
-            prompt = SUMMARY_REPORT_PROMPT.format(
-                total_count=len(analyses),
-                bullish_10y=attitude_stats['10Y']['看多'],
-                bearish_10y=attitude_stats['10Y']['看空'],
-                neutral_10y=attitude_stats['10Y']['中性'],
-                bullish_5y=attitude_stats['5Y']['看多'],
-                bearish_5y=attitude_stats['5Y']['看空'],
-                neutral_5y=attitude_stats['5Y']['中性'],
-                fundamental_views=json.dumps(dimension_views['基本面及通胀'], ensure_ascii=False),
-                liquidity_views=json.dumps(dimension_views['资金面'], ensure_ascii=False),
-                policy_views=json.dumps(dimension_views['货币及财政政策'], ensure_ascii=False),
-                institutional_views=json.dumps(dimension_views['机构行为'], ensure_ascii=False),
-                overseas_views=json.dumps(dimension_views['海外及其他'], ensure_ascii=False)
-            )
-
-            # 生成报告
-            summary = self.deepseek_client.chat(prompt)
-
-            # 保存报告
-            report_path = os.path.join(
-                self.output_dir,
-                f'债券市场观点内参_{timestamp}.txt'
-            )
-
-            with open(report_path, 'w', encoding='utf-8') as f:
-                f.write(f"债券市场观点内参\n")
-                f.write(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"分析文章数: {len(analyses)}篇\n")
-                f.write("=" * 80 + "\n\n")
-                f.write(summary)
-
-            self.logger.info(f"✓ 观点内参已生成: {report_path}")
-
-            # 在控制台显示
-            print("\n" + "=" * 80)
-            print("【债券市场观点内参】")
-            print("=" * 80)
-            print(summary)
-            print("=" * 80)
-
-        except Exception as e:
-            self.logger.error(f"✗ 生成文本报告失败: {e}")
-            import traceback
-            traceback.print_exc()
+            self.logger.exception(f"✗ 生成文本报告失败: {e}")
 
     def _calculate_attitude_statistics(self, analyses):
         """统计态度分布"""
-        stats = {
-            '10Y': {'看多': 0, '看空': 0, '中性': 0, '未涉及': 0},
-            '5Y': {'看多': 0, '看空': 0, '中性': 0, '未涉及': 0}
-        }
-
-        for analysis in analyses:
-            # 10Y态度
-            attitude_10y = analysis.get('10Y国债态度', '文章未涉及')
-            if '多' in attitude_10y:
-                stats['10Y']['看多'] += 1
-            elif '空' in attitude_10y:
-                stats['10Y']['看空'] += 1
-            elif '中性' in attitude_10y or '震荡' in attitude_10y:
-                stats['10Y']['中性'] += 1
-            else:
-                stats['10Y']['未涉及'] += 1
-
-            # 5Y态度
-            attitude_5y = analysis.get('5Y国债态度', '文章未涉及')
-            if '多' in attitude_5y:
-                stats['5Y']['看多'] += 1
-            elif '空' in attitude_5y:
-                stats['5Y']['看空'] += 1
-            elif '中性' in attitude_5y or '震荡' in attitude_5y:
-                stats['5Y']['中性'] += 1
-            else:
-                stats['5Y']['未涉及'] += 1
-
-        return stats
+        return self.data_processor.extract_yield_predictions(analyses)
 
     def _extract_dimension_views(self, analyses):
         """提取各维度观点"""
         views = {dim: [] for dim in self.analysis_dimensions}
 
+        # 每个维度最多保留5条，只遍历尚未收满的维度，全部收满后不再检查后续文章
+        pending = list(self.analysis_dimensions)
         for analysis in analyses:
             institution = analysis.get('机构', '')
-            for dim in self.analysis_dimensions:
+            for dim in pending:
                 content = analysis.get(dim, '')
                 if content and len(content) > 20:
                     views[dim].append(f"{institution}: {content}")
 
-        # 每个维度最多保留5条
-        for dim in views:
-            views[dim] = views[dim][:5]
+            pending = [dim for dim in pending if len(views[dim]) < 5]
+            if not pending:
+                break
 
         return views
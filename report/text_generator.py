@@ -1,9 +1,16 @@
 """文本报告生成器"""
 import os
+from collections import Counter
 from datetime import datetime
 from config.setting import OUTPUT_DIR
 
 
+# 报告分隔线
+_SEP_EQ = '=' * 80
+_DIGEST_SEP_EQ = '=' * 50
+_DIGEST_SEP_DASH = '-' * 50
+
+
 class TextGenerator:
     """文本报告生成器"""
 
@@ -47,11 +54,12 @@ class TextGenerator:
             metadata = {}
 
         article_count = metadata.get('article_count', '多')
+        generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
         # 格式化报告
         report_content = self.report_template.format(
-            timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            separator='=' * 80,
+            timestamp=generated_at,
+            separator=_SEP_EQ,
             content=summary_content,
             article_count=article_count
         )
@@ -61,18 +69,19 @@ class TextGenerator:
             f.write(report_content)
 
         # 同时生成Markdown版本
-        self._generate_markdown_version(summary_content, timestamp, metadata)
+        self._generate_markdown_version(summary_content, timestamp, metadata, generated_at)
 
         return filepath
 
-    def _generate_markdown_version(self, summary_content: str, timestamp: str, metadata: dict):
+    def _generate_markdown_version(self, summary_content: str, timestamp: str, metadata: dict,
+                                   generated_at: str):
         """生成Markdown版本的报告"""
         filename = f'债券市场观点报告_{timestamp}.md'
         filepath = os.path.join(self.output_dir, filename)
 
         markdown_content = f"""# 债券市场观点总结报告
 
-**生成时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+**生成时间**: {generated_at}
 
 ---
 
@@ -148,49 +157,35 @@ class TextGenerator:
         # 按机构分组
         by_institution = {}
         for analysis in analyses:
-            inst = analysis.get('机构', '未知')
-            if inst not in by_institution:
-                by_institution[inst] = []
-            by_institution[inst].append(analysis)
-
-        # 生成摘要
-        lines = [
-            f"债券市场观点日报 - {date}",
-            "=" * 50,
-            "",
-            f"今日共收录{len(analyses)}篇研究报告，涉及{len(by_institution)}家机构",
-            "",
-            "【主要观点】",
-            ""
+            by_institution.setdefault(analysis.get('机构', '未知'), []).append(analysis)
+
+        # 生成摘要：各段落末尾自带空行
+        sections = [
+            f"债券市场观点日报 - {date}\n{_DIGEST_SEP_EQ}\n\n"
+            f"今日共收录{len(analyses)}篇研究报告，涉及{len(by_institution)}家机构\n",
+            self._digest_opinions_section(by_institution),
+            f"【收益率预测】\n{self._summarize_yield_predictions(analyses)}\n",
+            f"【策略建议】\n{self._summarize_strategies(analyses)}\n",
+            f"{_DIGEST_SEP_DASH}\n详细内容请查看完整分析报告"
         ]
 
-        # 添加各机构观点
+        return '\n'.join(sections)
+
+    def _digest_opinions_section(self, by_institution: dict) -> str:
+        """主要观点段落：逐个列出机构及其高质量观点"""
+        blocks = []
         for inst, inst_analyses in by_institution.items():
-            lines.append(f"◆ {inst}")
-            for analysis in inst_analyses:
-                score = analysis.get('重要性评分', 0)
-                if score >= 7:  # 只包含高质量观点
-                    lines.append(f"  - {analysis.get('整体观点', '')[:100]}...")
-            lines.append("")
-
-        # 添加收益率预测汇总
-        lines.extend([
-            "【收益率预测】",
-            self._summarize_yield_predictions(analyses),
-            "",
-            "【策略建议】",
-            self._summarize_strategies(analyses),
-            "",
-            "-" * 50,
-            "详细内容请查看完整分析报告"
-        ])
-
-        return '\n'.join(lines)
+            opinions = [f"  - {analysis.get('整体观点', '')[:100]}..."
+                        for analysis in inst_analyses
+                        if analysis.get('重要性评分', 0) >= 7]  # 只包含高质量观点
+            blocks.append('\n'.join([f"◆ {inst}", *opinions, ""]))
+
+        return '\n'.join(["【主要观点】\n", *blocks])
 
     def _summarize_yield_predictions(self, analyses: list) -> str:
         """汇总收益率预测"""
-        predictions_10y = {'上行': 0, '下行': 0, '震荡': 0}
-        predictions_5y = {'上行': 0, '下行': 0, '震荡': 0}
+        # 预置各方向，票数相同时按上行、下行、震荡的顺序取
+        predictions_10y = Counter(dict.fromkeys(('上行', '下行', '震荡'), 0))
 
         for analysis in analyses:
             forecast_10y = analysis.get('10Y国债收益率预测', {})
@@ -206,7 +201,7 @@ class TextGenerator:
         # 生成预测文本
         total = sum(predictions_10y.values())
         if total > 0:
-            main_view = max(predictions_10y.items(), key=lambda x: x[1])
+            main_view = predictions_10y.most_common(1)[0]
             return f"10Y国债：{main_view[1]}家机构预测{main_view[0]}（占比{main_view[1] / total * 100:.0f}%）"
 
         return "暂无明确的收益率预测"
@@ -6,7 +6,9 @@ from datetime import datetime
 import os
 import sys
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __name__ == "__main__":
+    # 直接运行脚本时将项目根目录加入搜索路径
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from crawler.wechat_batch_crawler import WechatBatchCrawler
 from Main import BondMarketAnalysisSystem
@@ -46,75 +48,29 @@ class DailyScheduler:
         """生成每日分析报告"""
         try:
             today = datetime.now().strftime('%Y-%m-%d')
-            cache_dir = os.path.join('data', 'cache')
 
-            # 收集今天的文章
-            articles_data = []
+            # 与主程序共用同一套管理器和缓存文章解析逻辑
+            system = BondMarketAnalysisSystem()
 
-            for root, dirs, files in os.walk(cache_dir):
-                for file in files:
-                    if file.endswith('.txt') and today in file:
-                        filepath = os.path.join(root, file)
-                        # 解析文件获取元数据
-                        metadata = self._parse_article_metadata(filepath)
-                        if metadata:
-                            articles_data.append(metadata)
+            # 收集今天爬取、今天发布且有链接的文章（分类取自所在的分类文件夹）
+            articles_data = [
+                article for article in system.cache_manager.list_today_cached_articles(published_date=today)
+                if article['link']
+            ]
 
             if articles_data:
                 self.logger.info(f"找到 {len(articles_data)} 篇今日文章")
 
-                # 创建临时Excel
-                import pandas as pd
-                df = pd.DataFrame(articles_data)
-
-                temp_file = f'daily_articles_{today}.xlsx'
-                temp_path = os.path.join('data', 'input', temp_file)
-                df.to_excel(temp_path, index=False)
+                # 直接分析内存中的文章列表，不再经过临时Excel文件
+                analyses = system.analysis_manager.analyze_articles(articles_data)
 
-                # 运行分析
-                system = BondMarketAnalysisSystem()
-                system.run(temp_file)
-
-                # 清理
-                os.remove(temp_path)
+                # 生成报告
+                if analyses:
+                    system.report_manager.generate_reports(analyses)
 
         except Exception as e:
             self.logger.error(f"生成每日报告失败: {e}")
 
-    def _parse_article_metadata(self, filepath: str) -> dict:
-        """解析文章元数据"""
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-
-            metadata = {}
-            for line in lines[:10]:  # 只读前10行
-                if line.startswith('链接:'):
-                    metadata['链接'] = line.replace('链接:', '').strip()
-                elif line.startswith('机构:'):
-                    metadata['撰写机构'] = line.replace('机构:', '').strip()
-                elif line.startswith('日期:'):
-                    metadata['发布日期'] = line.replace('日期:', '').strip()
-                elif line.startswith('阅读数:'):
-                    metadata['阅读数'] = int(line.replace('阅读数:', '').strip() or '0')
-
-            # 获取文章内容
-            content_start = False
-            content = []
-            for line in lines:
-                if content_start:
-                    content.append(line)
-                elif line.startswith('-' * 80):
-                    content_start = True
-
-            metadata['文章内容'] = ''.join(content)
-
-            return metadata if '链接' in metadata else None
-
-        except Exception as e:
-            self.logger.error(f"解析文章失败: {e}")
-            return None
-
     def run(self):
         """运行调度器"""
         # 设置定时任务
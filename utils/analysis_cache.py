@@ -0,0 +1,53 @@
+"""文章分析结果缓存"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+# 分析结果格式版本，结果字段变化时递增，旧缓存自动失效
+ANALYSIS_SCHEMA_VERSION = 1
+
+
+class AnalysisCache:
+    """按文章内容哈希缓存DeepSeek分析结果（SQLite），重复运行时跳过已分析的文章"""
+
+    def __init__(self, db_file: str = os.path.join('data', 'cache', 'analyses.db'),
+                 ttl_days: float = 30):
+        self.ttl_seconds = ttl_days * 86400
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_file), exist_ok=True)
+        self._db = sqlite3.connect(db_file, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            "content_hash TEXT PRIMARY KEY, schema_version INTEGER, created_at REAL, analysis TEXT)"
+        )
+
+    @staticmethod
+    def content_hash(content: str) -> str:
+        """计算文章内容哈希"""
+        return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+    def get(self, content_hash: str) -> Optional[Dict]:
+        """读取未过期且版本一致的分析结果，不存在时返回None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT analysis FROM analyses WHERE content_hash = ? "
+                "AND schema_version = ? AND created_at >= ?",
+                (content_hash, ANALYSIS_SCHEMA_VERSION, time.time() - self.ttl_seconds)
+            ).fetchone()
+
+        return json.loads(row[0]) if row else None
+
+    def set(self, content_hash: str, analysis: Dict):
+        """保存分析结果（紧凑JSON，不含缩进和分隔符后的空格）"""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?)",
+                (content_hash, ANALYSIS_SCHEMA_VERSION, time.time(),
+                 json.dumps(analysis, ensure_ascii=False, separators=(',', ':')))
+            )
@@ -1,6 +1,13 @@
 # utils/article_classifier.py
 """文章分类器 - 统一管理文章分类逻辑"""
-from typing import Dict, List
+import sys
+from typing import Dict, List, Optional
+import numpy as np
+
+try:
+    import ahocorasick
+except ImportError:  # 未安装pyahocorasick时退回逐个关键词匹配
+    ahocorasick = None
 
 
 class ArticleClassifier:
@@ -44,20 +51,88 @@ class ArticleClassifier:
             '综合类': ['证券', '研究', '宏观', '策略', '金融']
         }
 
+        # 排除词列表（用于爬虫筛选）
+        self.exclude_keywords = [
+            '招聘', '培训', '广告', '活动', '会议', '年会', '福利',
+            '招标', '中标', '公告', '声明', '澄清', '通知', '征稿',
+            '直播', '报名', '课程', '讲座', '论坛', '峰会', '大会',
+            '获奖', '评选', '投票', '问卷', '调研活动', '有奖',
+            '红包', '抽奖', '赠送', '优惠', '折扣', '促销'
+        ]
+
+        # 预先构建关键词 -> 各类别得分向量，以及一次扫描全文的自动机
+        self._categories = tuple(self.keywords)
+        self._keyword_scores = self._build_keyword_scores()
+        self._automaton = self._build_automaton()
+
+        # 预先转小写的机构关键词和排除词，避免每篇文章重复处理
+        self._institution_keywords = {
+            category: tuple(sys.intern(k.lower())
+                            for k in self.institution_types.get(category.replace('类', ''), []))
+            for category in self.keywords
+        }
+        self._exclude_keywords = tuple(sys.intern(k.lower()) for k in self.exclude_keywords)
+
+    def _build_keyword_scores(self) -> Dict[str, np.ndarray]:
+        """汇总每个关键词对各类别的得分向量（重复出现的关键词得分累加）"""
+        keyword_scores = {}
+        for col, (category, keywords_dict) in enumerate(self.keywords.items()):
+            weight = keywords_dict['权重']
+            for tier, tier_score in (('强特征', 2), ('一般特征', 1)):
+                for keyword in keywords_dict[tier]:
+                    vector = keyword_scores.setdefault(
+                        sys.intern(keyword.lower()), np.zeros(len(self._categories))
+                    )
+                    vector[col] += tier_score * weight
+        return keyword_scores
+
+    def _build_automaton(self):
+        """构建Aho-Corasick自动机"""
+        if ahocorasick is None:
+            return None
+
+        automaton = ahocorasick.Automaton()
+        for keyword in self._keyword_scores:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return automaton
+
+    def _match_keywords(self, text: str):
+        """返回文本中出现过的关键词（每个关键词只计一次）"""
+        if self._automaton is not None:
+            return {keyword for _, keyword in self._automaton.iter(text)}
+        return [keyword for keyword in self._keyword_scores if keyword in text]
+
     def classify(self, title: str, institution: str = "", content: str = "",
-                 content_type: str = "") -> str:
+                 content_type: str = "", *, prefix_len: int = 500) -> str:
         """分类文章
 
         Args:
             title: 文章标题
             institution: 机构名称
-            content: 文章内容（前500字）
+            content: 文章内容（只扫描前prefix_len字，调用方无需预先截取）
             content_type: 预设的内容类型（如果有）
+            prefix_len: 参与分类的内容前缀长度
 
         Returns:
             文章类型：固收类、权益类、宏观类、其他
         """
         # 如果有预设的内容类型，优先使用
+        preset_type = self._preset_type(content_type)
+        if preset_type:
+            return preset_type
+
+        scores = self._score_text(title, institution, content[:prefix_len])
+
+        # 如果文本太短或没有明显特征，返回其他
+        if scores is None or scores.max() < 2:
+            return '其他'
+
+        # 返回得分最高的类别
+        return self._categories[scores.argmax()]
+
+    def _preset_type(self, content_type: str) -> Optional[str]:
+        """根据预设的内容类型确定分类，无法确定时返回None"""
         if content_type:
             if '固收' in content_type or '债' in content_type:
                 return '固收类'
@@ -65,59 +140,35 @@ class ArticleClassifier:
                 return '权益类'
             elif '宏观' in content_type:
                 return '宏观类'
+        return None
 
+    def _score_text(self, title: str, institution: str, content: str) -> Optional[np.ndarray]:
+        """计算各类别得分向量（顺序同self._categories），文本太短时返回None"""
         # 合并所有文本进行分析
         full_text = f"{title} {institution} {content}".lower()
-
-        # 如果文本太短，返回其他
         if len(full_text) < 20:
-            return '其他'
-
-        # 计算各类别得分
-        scores = {}
-
-        for category, keywords_dict in self.keywords.items():
-            score = 0
-
-            # 强特征匹配
-            for keyword in keywords_dict['强特征']:
-                if keyword.lower() in full_text:
-                    score += 2 * keywords_dict['权重']
+            return None
 
-            # 一般特征匹配
-            for keyword in keywords_dict['一般特征']:
-                if keyword.lower() in full_text:
-                    score += 1 * keywords_dict['权重']
+        # 关键词匹配（强特征/一般特征）
+        scores = np.zeros(len(self._categories))
+        for keyword in self._match_keywords(full_text):
+            scores += self._keyword_scores[keyword]
 
-            # 机构名称加权
-            for inst_keyword in self.institution_types.get(category.replace('类', ''), []):
-                if inst_keyword.lower() in institution.lower():
-                    score += 1.5
+        # 机构名称加权
+        institution_lower = institution.lower()
+        for col, category in enumerate(self._categories):
+            for inst_keyword in self._institution_keywords[category]:
+                if inst_keyword in institution_lower:
+                    scores[col] += 1.5
 
-            scores[category] = score
-
-        # 如果没有明显特征，返回其他
-        if max(scores.values()) < 2:
-            return '其他'
-
-        # 返回得分最高的类别
-        return max(scores, key=scores.get)
+        return scores
 
     def is_relevant_article(self, title: str, digest: str, content_type: str) -> bool:
         """判断文章是否相关（用于爬虫筛选）"""
-        # 更新排除词列表
-        exclude_keywords = [
-            '招聘', '培训', '广告', '活动', '会议', '年会', '福利',
-            '招标', '中标', '公告', '声明', '澄清', '通知', '征稿',
-            '直播', '报名', '课程', '讲座', '论坛', '峰会', '大会',
-            '获奖', '评选', '投票', '问卷', '调研活动', '有奖',
-            '红包', '抽奖', '赠送', '优惠', '折扣', '促销'
-        ]
-
         text = (title + digest).lower()
 
         # 检查排除词
-        for keyword in exclude_keywords:
+        for keyword in self._exclude_keywords:
             if keyword in text:
                 return False
 
@@ -137,22 +188,35 @@ class ArticleClassifier:
             '其他': []
         }
 
-        for article in articles:
-            # 优先使用已有的分类（例如从缓存文件夹读取的）
-            existing_type = article.get('article_type', '')
-
-            if existing_type in classified:
-                # 如果已有分类且有效，直接使用
-                article_type = existing_type
-            else:
-                # 否则重新分类
-                article_type = self.classify(
-                    title=article.get('title', ''),
-                    institution=article.get('institution', ''),
-                    content=article.get('content', '')[:500] if article.get('content') else '',
-                    content_type=article.get('content_type', '')
-                )
-
+        # 优先使用已有的分类（例如从缓存文件夹读取的）或预设内容类型，其余文章统一打分
+        labels = [article.get('article_type', '') for article in articles]
+        pending = []
+        for row, article in enumerate(articles):
+            if labels[row] not in classified:
+                labels[row] = self._preset_type(article.get('content_type', ''))
+                if labels[row] is None:
+                    pending.append(row)
+
+        # 得分矩阵：每行一篇文章，每列一个类别；文本太短的文章得分为0
+        scores = np.zeros((len(pending), len(self._categories)))
+        for i, row in enumerate(pending):
+            article = articles[row]
+            row_scores = self._score_text(
+                article.get('title', ''),
+                article.get('institution', ''),
+                (article.get('content') or '')[:500]
+            )
+            if row_scores is not None:
+                scores[i] = row_scores
+
+        pending_labels = np.where(
+            scores.max(axis=1, initial=0) < 2, '其他',
+            np.array(self._categories, dtype=object)[scores.argmax(axis=1)]
+        )
+        for row, label in zip(pending, pending_labels):
+            labels[row] = label
+
+        for article, article_type in zip(articles, labels):
             article['article_type'] = article_type
             classified[article_type].append(article)
 
@@ -1,11 +1,47 @@
 """缓存管理器 - 统一管理所有缓存功能"""
 import os
+import re
 import json
+import logging
+import sqlite3
 import hashlib
-from datetime import datetime
+from datetime import datetime, date as date_cls
+from functools import lru_cache
 from typing import Optional, List, Dict
+import pandas as pd
 from .file_handler import FileHandler
 from .logger import setup_logger
+from config.setting import ARTICLE_TYPES
+
+try:
+    from pybloom_live import ScalableBloomFilter
+except ImportError:  # 未安装时用内存中的哈希集合代替
+    ScalableBloomFilter = None
+
+
+# 文章哈希算法标识，变更算法时SQLite中的旧哈希会按标题/机构/日期重算
+ARTICLE_HASH_SCHEME = 'blake2b-64-us'
+
+
+@lru_cache(maxsize=4096)
+def _article_hash(title: str, institution: str, date: str) -> str:
+    """计算文章唯一标识哈希（去重检查与标记已处理会先后计算同一篇文章）
+
+    各字段依次送入哈希器，以不可见的单元分隔符分隔，避免标题中的“_”造成字段边界歧义。
+    """
+    hasher = hashlib.blake2b(digest_size=8)
+    hasher.update(str(title).encode('utf-8'))
+    hasher.update(b'\x1f')
+    hasher.update(str(institution).encode('utf-8'))
+    hasher.update(b'\x1f')
+    hasher.update(str(date).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+# 缓存文章文件头部的元数据行，以及元数据与正文之间的分隔线
+_META_LINE_RE = re.compile(r'^(标题|机构|日期|链接|阅读数):(.*)$', re.MULTILINE)
+_CONTENT_SEPARATOR_RE = re.compile(r'^-{80}.*$', re.MULTILINE)
+_META_FIELDS = {'标题': 'title', '机构': 'institution', '日期': 'date', '链接': 'link', '阅读数': 'read_num'}
 
 
 class CacheManager:
@@ -14,9 +50,12 @@ class CacheManager:
     def __init__(self):
         self.logger = setup_logger("CacheManager")
         self.file_handler = FileHandler()
-        self.hash_cache_file = os.path.join('data', 'cache', 'article_hashes.json')
-        self.article_hashes = self._load_article_hashes()
+        self.hash_cache_file = os.path.join('data', 'cache', 'article_hashes.json')  # 旧版JSON，仅用于迁移
+        self.hash_db_file = os.path.join('data', 'cache', 'article_hashes.db')
+        self._hash_db = self._open_hash_db()
+        self._hash_bloom = self._build_hash_bloom()
         self._article_classifier = None  # 延迟加载
+        self._parsed_articles = {}  # 缓存文件路径 -> (修改时间, 解析结果)
 
     @property
     def article_classifier(self):
@@ -26,48 +65,175 @@ class CacheManager:
             self._article_classifier = ArticleClassifier()
         return self._article_classifier
 
-    def _load_article_hashes(self) -> dict:
-        """加载已爬取文章的哈希值"""
-        if os.path.exists(self.hash_cache_file):
-            try:
-                with open(self.hash_cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
-
-    def _save_article_hashes(self):
-        """保存文章哈希值"""
-        os.makedirs(os.path.dirname(self.hash_cache_file), exist_ok=True)
-        with open(self.hash_cache_file, 'w', encoding='utf-8') as f:
-            json.dump(self.article_hashes, f, ensure_ascii=False, indent=2)
+    def _open_hash_db(self) -> sqlite3.Connection:
+        """打开已处理文章索引（SQLite），首次使用时迁移旧版JSON"""
+        os.makedirs(os.path.dirname(self.hash_db_file), exist_ok=True)
+        conn = sqlite3.connect(self.hash_db_file)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS article_hashes ("
+            "hash TEXT PRIMARY KEY, title TEXT, institution TEXT, date TEXT, "
+            "processed_day INTEGER) WITHOUT ROWID"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        if conn.execute("SELECT 1 FROM article_hashes LIMIT 1").fetchone() is None:
+            self._migrate_json_hashes(conn)
+
+        scheme = conn.execute("SELECT value FROM meta WHERE key = 'hash_scheme'").fetchone()
+        if scheme is None or scheme[0] != ARTICLE_HASH_SCHEME:
+            self._rehash_articles(conn)
+
+        return conn
+
+    def _build_hash_bloom(self):
+        """用SQLite中的哈希构建布隆过滤器，作为“未处理”判断的快速路径
+
+        未安装pybloom_live时退回普通集合（64位哈希每条仅16字符，全部载入内存开销很小）。
+        """
+        rows = self._hash_db.execute("SELECT hash FROM article_hashes")
+        if ScalableBloomFilter is None:
+            return {article_hash for (article_hash,) in rows}
+
+        bloom = ScalableBloomFilter(initial_capacity=100000, error_rate=0.001)
+        for (article_hash,) in rows:
+            bloom.add(article_hash)
+        return bloom
+
+    def _rehash_articles(self, conn: sqlite3.Connection):
+        """哈希算法变更后，用保存的标题/机构/日期重算全部哈希"""
+        rows = conn.execute(
+            "SELECT title, institution, date, processed_day FROM article_hashes"
+        ).fetchall()
+
+        with conn:
+            conn.execute("DELETE FROM article_hashes")
+            conn.executemany(
+                "INSERT OR REPLACE INTO article_hashes VALUES (?, ?, ?, ?, ?)",
+                [(_article_hash(title, institution, date), title, institution, date, processed_day)
+                 for title, institution, date, processed_day in rows]
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('hash_scheme', ?)", (ARTICLE_HASH_SCHEME,)
+            )
+
+        if rows:
+            self.logger.info(f"文章哈希算法已更新为 {ARTICLE_HASH_SCHEME}，重算 {len(rows)} 条记录")
+
+    def _migrate_json_hashes(self, conn: sqlite3.Connection):
+        """将旧版article_hashes.json导入SQLite"""
+        if not os.path.exists(self.hash_cache_file):
+            return
+
+        try:
+            with open(self.hash_cache_file, 'r', encoding='utf-8') as f:
+                legacy_hashes = json.load(f)
+        except Exception as e:
+            self.logger.warning(f"读取旧版哈希文件失败: {e}")
+            return
+
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO article_hashes VALUES (?, ?, ?, ?, ?)",
+                [
+                    (h, info.get('title'), info.get('institution'), info.get('date'),
+                     self._processed_day(info.get('processed_date')))
+                    for h, info in legacy_hashes.items()
+                ]
+            )
+        self.logger.info(f"已迁移 {len(legacy_hashes)} 条文章哈希到SQLite")
+
+    @staticmethod
+    def _processed_day(processed_date: Optional[str]) -> Optional[int]:
+        """处理日期（ISO格式）转为日序号，无法解析时返回None"""
+        try:
+            return date_cls.fromisoformat(processed_date).toordinal()
+        except (TypeError, ValueError):
+            return None
 
     def _get_article_hash(self, title: str, institution: str, date: str) -> str:
         """生成文章唯一标识哈希"""
-        content = f"{title}_{institution}_{date}"
-        return hashlib.md5(content.encode()).hexdigest()
+        return _article_hash(title, institution, date)
 
     def is_article_processed(self, title: str, institution: str, date: str) -> bool:
         """检查文章是否已处理"""
         article_hash = self._get_article_hash(title, institution, date)
-        return article_hash in self.article_hashes
+
+        # 布隆过滤器（或哈希集合）判定不存在则一定未处理，只有可能存在时才查SQLite
+        if article_hash not in self._hash_bloom:
+            return False
+
+        row = self._hash_db.execute(
+            "SELECT 1 FROM article_hashes WHERE hash = ?", (article_hash,)
+        ).fetchone()
+        return row is not None
 
     def mark_article_processed(self, title: str, institution: str, date: str):
         """标记文章已处理"""
         article_hash = self._get_article_hash(title, institution, date)
-        self.article_hashes[article_hash] = {
-            'title': title,
-            'institution': institution,
-            'date': date,
-            'processed_date': datetime.now().date().isoformat(),
-            'processed_time': datetime.now().isoformat()
-        }
-        self._save_article_hashes()
+        with self._hash_db:
+            self._hash_db.execute(
+                "INSERT OR REPLACE INTO article_hashes VALUES (?, ?, ?, ?, ?)",
+                (article_hash, title, institution, date, date_cls.today().toordinal())
+            )
+
+        self._hash_bloom.add(article_hash)
+
+    def split_processed_articles(self, articles: List[Dict]) -> tuple:
+        """批量去重：返回 (未处理的文章列表, 跳过的文章数)
+
+        已处理的文章以及同一批次中重复出现的文章都会被跳过。
+        """
+        hashes = [self._get_article_hash(a['title'], a['institution'], a['date']) for a in articles]
+        processed = self._find_processed_hashes(set(hashes))
+
+        new_articles = []
+        for article, article_hash in zip(articles, hashes):
+            if article_hash in processed:
+                continue
+            processed.add(article_hash)
+            new_articles.append(article)
+
+        return new_articles, len(articles) - len(new_articles)
+
+    def _find_processed_hashes(self, article_hashes: set) -> set:
+        """批量查询已处理的文章哈希"""
+        # 哈希集合没有误判，直接以集合判定，无需再查SQLite
+        if isinstance(self._hash_bloom, set):
+            return {h for h in article_hashes if h in self._hash_bloom}
+
+        article_hashes = [h for h in article_hashes if h in self._hash_bloom]
+        processed = set()
+
+        # SQLite单条语句的参数个数有限制，分批查询
+        for start in range(0, len(article_hashes), 500):
+            chunk = article_hashes[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._hash_db.execute(
+                f"SELECT hash FROM article_hashes WHERE hash IN ({placeholders})", chunk
+            )
+            processed.update(row[0] for row in rows)
+
+        return processed
+
+    def mark_articles_processed(self, articles: List[Dict]):
+        """批量标记文章已处理（单个事务写入）"""
+        processed_day = date_cls.today().toordinal()
+        rows = [(self._get_article_hash(a['title'], a['institution'], a['date']),
+                 a['title'], a['institution'], a['date'], processed_day)
+                for a in articles]
+
+        with self._hash_db:
+            self._hash_db.executemany(
+                "INSERT OR REPLACE INTO article_hashes VALUES (?, ?, ?, ?, ?)", rows
+            )
+
+        for row in rows:
+            self._hash_bloom.add(row[0])
 
     def get_cached_content(self, url: str) -> str:
         """获取缓存内容"""
         # 优先检查今天的缓存
-        today_folder = datetime.now().strftime('%Y%m%d')
+        today_folder = self.file_handler.today_folder()
         content = self.file_handler.check_cache(url, today_folder)
 
         # 如果今天没有，检查所有缓存
@@ -86,39 +252,46 @@ class CacheManager:
         self.logger.info(f"内容已缓存到: {article_type}/{os.path.basename(cache_path)}")
 
     def save_article_with_auto_classify(self, url: str, institution: str,
-                                      date: str, title: str, content: str):
-        """保存文章并自动分类"""
+                                      date: str, title: str, content: str,
+                                      article_type: str = None):
+        """保存文章，未提供分类时自动分类"""
         # 使用分类器自动分类
-        article_type = self.article_classifier.classify(
-            title, institution, content[:500]
-        )
+        if article_type is None:
+            article_type = self.article_classifier.classify(title, institution, content)
 
         # 保存到缓存
         self.save_article_cache(url, institution, date, title, article_type, content)
 
-    def get_today_articles_for_analysis(self) -> List[Dict]:
-        """获取今天的缓存文章供分析"""
-        today_folder = datetime.now().strftime('%Y%m%d')
-        cache_path = os.path.join('data', 'cache', today_folder)
+    def list_today_cached_files(self) -> Dict[str, List[os.DirEntry]]:
+        """列出今天各分类文件夹中的缓存文章文件（分类 -> 文件列表，不存在的文件夹不列出）"""
+        cache_path = os.path.join('data', 'cache', self.file_handler.today_folder())
+        files_by_type = {}
 
-        if not os.path.exists(cache_path):
-            self.logger.info("今天没有缓存文件夹")
-            return []
+        for type_folder in ARTICLE_TYPES:
+            try:
+                with os.scandir(os.path.join(cache_path, type_folder)) as entries:
+                    files_by_type[type_folder] = [
+                        entry for entry in entries if entry.name.endswith('.txt') and entry.is_file()
+                    ]
+            except (FileNotFoundError, NotADirectoryError):
+                continue
 
-        articles = []
+        return files_by_type
 
-        # 遍历所有类型文件夹
-        for type_folder in ['固收类', '权益类', '宏观类', '其他']:
-            type_path = os.path.join(cache_path, type_folder)
-            if not os.path.exists(type_path):
-                continue
+    def get_today_articles_for_analysis(self, analysis_mode: str = None,
+                                        files_by_type: Dict[str, List[os.DirEntry]] = None) -> List[Dict]:
+        """获取今天的缓存文章供分析（analysis_mode为None时交互选择）
 
-            for file_name in os.listdir(type_path):
-                if file_name.endswith('.txt'):
-                    file_path = os.path.join(type_path, file_name)
-                    article_info = self._parse_cached_article(file_path, type_folder)
-                    if article_info:
-                        articles.append(article_info)
+        files_by_type: 已由list_today_cached_files列出的文件，提供时不再重复遍历文件夹
+        """
+        if files_by_type is None:
+            today_folder = self.file_handler.today_folder()
+            if not os.path.exists(os.path.join('data', 'cache', today_folder)):
+                self.logger.info("今天没有缓存文件夹")
+                return []
+            files_by_type = self.list_today_cached_files()
+
+        articles = self.list_today_cached_articles(files_by_type=files_by_type)
 
         self.logger.info(f"找到 {len(articles)} 篇今日缓存文章")
 
@@ -126,7 +299,40 @@ class CacheManager:
             return []
 
         # 显示文章并让用户选择
-        return self._select_articles_for_analysis(articles)
+        return self._select_articles_for_analysis(articles, analysis_mode)
+
+    def list_today_cached_articles(self, published_date: str = None,
+                                   files_by_type: Dict[str, List[os.DirEntry]] = None) -> List[Dict]:
+        """解析今天缓存的文章（分类取自所在的分类文件夹）
+
+        published_date: 只保留文件名中含该发布日期（YYYY-MM-DD）的文章
+        files_by_type: 已由list_today_cached_files列出的文件，提供时不再重复遍历文件夹
+        """
+        if files_by_type is None:
+            files_by_type = self.list_today_cached_files()
+
+        articles = []
+
+        # 遍历所有类型文件夹
+        for type_folder, entries in files_by_type.items():
+            for entry in entries:
+                if published_date and published_date not in entry.name:
+                    continue
+                article_info = self._parse_cached_article_memo(entry, type_folder)
+                if article_info:
+                    articles.append(article_info)
+
+        return articles
+
+    def _parse_cached_article_memo(self, entry: os.DirEntry, article_type: str) -> Optional[Dict]:
+        """解析缓存文章，文件未修改时复用上次的解析结果（返回副本，调用方可修改）"""
+        mtime_ns = entry.stat().st_mtime_ns
+        memo = self._parsed_articles.get(entry.path)
+        if memo is None or memo[0] != mtime_ns:
+            memo = (mtime_ns, self._parse_cached_article(entry.path, article_type))
+            self._parsed_articles[entry.path] = memo
+
+        return dict(memo[1]) if memo[1] else None
 
     def _parse_cached_article(self, file_path: str, article_type: str) -> Dict:
         """解析缓存的文章文件"""
@@ -138,30 +344,22 @@ class CacheManager:
                 'article_type': article_type
             }
 
-            # 解析元数据
-            lines = content.split('\n')
-            metadata_found = False
-
-            for i, line in enumerate(lines):
-                if line.startswith('标题:'):
-                    article_info['title'] = line.replace('标题:', '').strip()
-                    metadata_found = True
-                elif line.startswith('机构:'):
-                    article_info['institution'] = line.replace('机构:', '').strip()
-                elif line.startswith('日期:'):
-                    article_info['date'] = line.replace('日期:', '').strip()
-                elif line.startswith('链接:'):
-                    article_info['link'] = line.replace('链接:', '').strip()
-                    self.logger.debug(f"解析到链接: {article_info['link']}")
-                elif line.startswith('阅读数:'):
-                    try:
-                        article_info['read_num'] = int(line.replace('阅读数:', '').strip() or '0')
-                    except:
-                        article_info['read_num'] = 0
-                elif line.startswith('-' * 80):
-                    # 找到分隔符，后面是正文
-                    article_info['content'] = '\n'.join(lines[i + 1:]).strip()
-                    break
+            # 找到分隔符，后面是正文；元数据只在分隔符之前查找
+            separator = _CONTENT_SEPARATOR_RE.search(content)
+            header = content[:separator.start()] if separator else content
+            if separator:
+                article_info['content'] = content[separator.end():].strip()
+
+            # 一次正则扫描解析全部元数据行
+            for label, value in _META_LINE_RE.findall(header):
+                article_info[_META_FIELDS[label]] = value.strip()
+            metadata_found = 'title' in article_info
+
+            if 'read_num' in article_info:
+                try:
+                    article_info['read_num'] = int(article_info['read_num'] or '0')
+                except ValueError:
+                    article_info['read_num'] = 0
 
             # 如果没有找到元数据，说明是旧格式或损坏的文件
             if not metadata_found:
@@ -182,12 +380,13 @@ class CacheManager:
             article_info.setdefault('link', '')  # 如果没有链接，设为空字符串
             article_info.setdefault('content', '')
 
-            # 调试信息
-            self.logger.debug(f"解析文章: {article_info['title']}")
-            self.logger.debug(f"  - 机构: {article_info['institution']}")
-            self.logger.debug(f"  - 日期: {article_info['date']}")
-            self.logger.debug(f"  - 链接: {article_info['link'] if article_info['link'] else '无链接'}")
-            self.logger.debug(f"  - 内容长度: {len(article_info['content'])}")
+            # 调试信息（每篇缓存文章都会解析，未开启DEBUG时不拼接日志字符串）
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("解析文章: %s", article_info['title'])
+                self.logger.debug("  - 机构: %s", article_info['institution'])
+                self.logger.debug("  - 日期: %s", article_info['date'])
+                self.logger.debug("  - 链接: %s", article_info['link'] or '无链接')
+                self.logger.debug("  - 内容长度: %d", len(article_info['content']))
 
             return article_info
 
@@ -195,8 +394,9 @@ class CacheManager:
             self.logger.error(f"解析缓存文章失败 {file_path}: {e}")
             return None
 
-    def _select_articles_for_analysis(self, articles: List[Dict]) -> List[Dict]:
-        """让用户选择要分析的文章"""
+    def _select_articles_for_analysis(self, articles: List[Dict],
+                                      analysis_mode: str = None) -> List[Dict]:
+        """让用户选择要分析的文章（analysis_mode为None时交互选择）"""
         # 使用分类器分类
         classified_articles = self.article_classifier.classify_batch(articles)
 
@@ -204,7 +404,8 @@ class CacheManager:
         self._show_classification_stats(classified_articles)
 
         # 让用户选择分析模式
-        analysis_mode = self._select_analysis_mode()
+        if analysis_mode is None:
+            analysis_mode = self._select_analysis_mode()
 
         # 根据选择返回筛选后的文章
         if analysis_mode == 'bond_only':
@@ -226,12 +427,15 @@ class CacheManager:
         print("文章分类统计")
         print("=" * 60)
 
-        total = sum(len(articles) for articles in classified_articles.values())
+        # 各类别数量及占比一次算出
+        counts = pd.Series({category: len(articles) for category, articles in classified_articles.items()},
+                           dtype='int64')
+        # 没有文章时占比为0/0=NaN，统一填0
+        percentages = (counts * 100.0 / counts.sum()).fillna(0)
 
         for category, articles in classified_articles.items():
-            count = len(articles)
-            percentage = (count / total * 100) if total > 0 else 0
-            print(f"{category}: {count}篇 ({percentage:.1f}%)")
+            count = counts[category]
+            print(f"{category}: {count}篇 ({percentages[category]:.1f}%)")
 
             if articles and count > 0:
                 print(f"  示例文章:")
@@ -266,7 +470,7 @@ class CacheManager:
 
     def show_today_statistics(self):
         """显示今日缓存统计"""
-        today_folder = datetime.now().strftime('%Y%m%d')
+        today_folder = self.file_handler.today_folder()
         stats = self.file_handler.get_cache_statistics(today_folder)
 
         print("\n" + "=" * 60)
@@ -6,6 +6,57 @@ import pandas as pd
 from datetime import datetime
 import logging
 from collections import Counter
+from functools import lru_cache
+from itertools import product
+from config.setting import ANALYSIS_DIMENSIONS
+
+
+# 统计态度的国债期限及态度类别
+ATTITUDE_TERMS = ('10Y', '5Y')
+ATTITUDE_LABELS = ('看多', '看空', '中性', '未涉及')
+
+
+def _attitude_label(attitude: str) -> str:
+    """将分析结果中的国债态度归为看多/看空/中性/未涉及"""
+    if '多' in attitude:
+        return '看多'
+    elif '空' in attitude:
+        return '看空'
+    elif '中性' in attitude or '震荡' in attitude:
+        return '中性'
+    return '未涉及'
+
+
+# 支持的日期格式（按顺序尝试）
+_DATE_FORMATS = (
+    '%Y-%m-%d',
+    '%Y/%m/%d',
+    '%Y.%m.%d',
+    '%Y年%m月%d日',
+    '%m/%d/%Y',
+    '%d/%m/%Y',
+    '%Y%m%d'
+)
+
+
+# 文本清理和数字提取用到的正则（模块加载时编译一次）
+_WHITESPACE_RE = re.compile(r'\s+')
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x1f\x7f-\x9f]')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+_NUMBER_RE = re.compile(r'[-+]?\d+\.?\d*%?')
+
+
+@lru_cache(maxsize=1024)
+def _normalize_date(date_str: str) -> str:
+    """将日期字符串标准化为YYYY-MM-DD（同一批文章的日期大量重复，缓存解析结果）"""
+    for fmt in _DATE_FORMATS:
+        try:
+            dt = datetime.strptime(date_str, fmt)
+            return dt.strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+
+    return date_str
 
 
 class DataProcessor:
@@ -20,9 +71,9 @@ class DataProcessor:
         if not text:
             return ""
 
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', text)
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        text = _WHITESPACE_RE.sub(' ', text)
+        text = _CONTROL_CHARS_RE.sub('', text)
+        text = _BLANK_LINES_RE.sub('\n\n', text)
         text = text.strip()
 
         return text
@@ -32,8 +83,7 @@ class DataProcessor:
         if not text:
             return []
 
-        pattern = r'[-+]?\d+\.?\d*%?'
-        matches = re.findall(pattern, text)
+        matches = _NUMBER_RE.findall(text)
 
         numbers = []
         for match in matches:
@@ -50,33 +100,12 @@ class DataProcessor:
 
     def extract_yield_predictions(self, analyses: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
         """提取收益率预测态度统计"""
-        stats = {
-            '10Y': {'看多': 0, '看空': 0, '中性': 0, '未涉及': 0},
-            '5Y': {'看多': 0, '看空': 0, '中性': 0, '未涉及': 0}
-        }
+        stats = {term: dict.fromkeys(ATTITUDE_LABELS, 0) for term in ATTITUDE_TERMS}
 
-        for analysis in analyses:
-            # 10Y态度
-            attitude_10y = analysis.get('10Y国债态度', '文章未涉及')
-            if '多' in attitude_10y:
-                stats['10Y']['看多'] += 1
-            elif '空' in attitude_10y:
-                stats['10Y']['看空'] += 1
-            elif '中性' in attitude_10y or '震荡' in attitude_10y:
-                stats['10Y']['中性'] += 1
-            else:
-                stats['10Y']['未涉及'] += 1
-
-            # 5Y态度
-            attitude_5y = analysis.get('5Y国债态度', '文章未涉及')
-            if '多' in attitude_5y:
-                stats['5Y']['看多'] += 1
-            elif '空' in attitude_5y:
-                stats['5Y']['看空'] += 1
-            elif '中性' in attitude_5y or '震荡' in attitude_5y:
-                stats['5Y']['中性'] += 1
-            else:
-                stats['5Y']['未涉及'] += 1
+        # 每篇文章 x 每个期限 展开为一次统计
+        for analysis, term in product(analyses, ATTITUDE_TERMS):
+            attitude = analysis.get(f'{term}国债态度', '文章未涉及')
+            stats[term][_attitude_label(attitude)] += 1
 
         return stats
 
@@ -116,27 +145,8 @@ class DataProcessor:
         if not date_str or pd.isna(date_str):
             return ""
 
-        date_str = str(date_str).strip()
-
         # 尝试多种日期格式
-        date_formats = [
-            '%Y-%m-%d',
-            '%Y/%m/%d',
-            '%Y.%m.%d',
-            '%Y年%m月%d日',
-            '%m/%d/%Y',
-            '%d/%m/%Y',
-            '%Y%m%d'
-        ]
-
-        for fmt in date_formats:
-            try:
-                dt = datetime.strptime(date_str, fmt)
-                return dt.strftime('%Y-%m-%d')
-            except ValueError:
-                continue
-
-        return date_str
+        return _normalize_date(str(date_str).strip())
 
     def parse_date_range(self, dates: List[str]) -> str:
         """解析日期范围"""
@@ -161,18 +171,10 @@ class DataProcessor:
 
     def _calculate_dimension_stats(self, analyses: List[Dict[str, Any]]) -> Dict[str, int]:
         """统计各维度出现次数"""
-        dimensions = [
-            '基本面及通胀',
-            '资金面',
-            '货币及财政政策',
-            '机构行为',
-            '海外及其他'
-        ]
-
-        stats = {dim: 0 for dim in dimensions}
+        stats = {dim: 0 for dim in ANALYSIS_DIMENSIONS}
 
         for analysis in analyses:
-            for dim in dimensions:
+            for dim in ANALYSIS_DIMENSIONS:
                 content = analysis.get(dim, '')
                 if content and len(str(content).strip()) > 10:
                     stats[dim] += 1
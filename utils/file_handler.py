@@ -2,45 +2,106 @@
 """文件处理工具 - 简化版"""
 import os
 import hashlib
+import threading
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, date
+from functools import lru_cache
 from typing import List, Tuple, Optional
-from config.setting import INPUT_DIR, CACHE_DIR
+from config.setting import INPUT_DIR, CACHE_DIR, ARTICLE_TYPES
+
+
+@lru_cache(maxsize=1024)
+def _url_hash(url: str) -> str:
+    """缓存文件名中使用的URL哈希（同一链接会被多次查找缓存）"""
+    return hashlib.md5(url.encode()).hexdigest()[:10]
+
+
+@lru_cache(maxsize=8)
+def _date_folder(day: date) -> str:
+    """日期对应的缓存文件夹名（YYYYMMDD）"""
+    return day.strftime('%Y%m%d')
+
+
+# Excel链接模式读取的列，其余列（如阅读数）不解析
+_EXCEL_LINK_COLUMNS = frozenset(['链接', '撰写机构', '发布日期', '文章内容', '文章标题'])
+
+
+# 本次运行中已确认存在的目录，避免每篇文章保存时重复mkdir
+_ensured_dirs = set()
+
+
+def _ensure_dir(path: str):
+    """确保目录存在（每个目录每次运行只创建一次）"""
+    if path not in _ensured_dirs:
+        os.makedirs(path, exist_ok=True)
+        _ensured_dirs.add(path)
+
+
+# 缓存文件索引：URL哈希 -> 缓存文件路径列表（首次查找时遍历一次缓存目录，保存缓存时同步更新）
+_cache_index = None
+_cache_index_lock = threading.Lock()
+
+
+def _cache_index_key(file_name: str) -> str:
+    """从缓存文件名中取出URL哈希（文件名最后一段；旧版文件名中是完整MD5，取前10位）"""
+    return os.path.splitext(file_name)[0].rsplit('_', 1)[-1][:10]
+
+
+def _get_cache_index() -> dict:
+    """返回缓存文件索引，尚未建立时遍历缓存目录建立"""
+    global _cache_index
+    with _cache_index_lock:
+        if _cache_index is None:
+            index = {}
+            for root, dirs, files in os.walk(CACHE_DIR):
+                for file in files:
+                    if file.endswith('.txt'):
+                        index.setdefault(_cache_index_key(file), []).append(os.path.join(root, file))
+            _cache_index = index
+        return _cache_index
+
+
+def _reset_cache_index():
+    """缓存文件被批量删除后丢弃索引，下次查找时重建"""
+    global _cache_index
+    with _cache_index_lock:
+        _cache_index = None
 
 
 class FileHandler:
     """文件处理器 - 只负责文件操作"""
     
     @staticmethod
-    def read_excel_links(file_name: str) -> Tuple[List[str], List[str], List[str], List[str]]:
-        """从Excel读取链接"""
+    def read_excel_links(file_name: str) -> Tuple[List[str], List[str], List[str], List[str], List[str]]:
+        """从Excel读取链接及机构、日期、预存内容、标题（只读取一次文件，且只解析用到的列）"""
         file_path = os.path.join(INPUT_DIR, file_name)
         
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"文件不存在: {file_path}")
         
-        df = pd.read_excel(file_path)
+        df = pd.read_excel(file_path, usecols=lambda col: col in _EXCEL_LINK_COLUMNS)
         
         links = df['链接'].dropna().tolist()
         institutions = df['撰写机构'].tolist() if '撰写机构' in df.columns else [''] * len(links)
         dates = df['发布日期'].tolist() if '发布日期' in df.columns else [''] * len(links)
         contents = df['文章内容'].tolist() if '文章内容' in df.columns else [None] * len(links)
+        titles = df['文章标题'].fillna('').tolist() if '文章标题' in df.columns else [''] * len(df)
         
-        return links, institutions, dates, contents
+        return links, institutions, dates, contents, titles
     
     @staticmethod
     def get_cache_path(url: str, institution: str, date: str, title: str = "",
                       article_type: str = "其他") -> str:
         """获取缓存文件路径 - 按日期和类型组织"""
         # 创建日期文件夹
-        date_folder = datetime.now().strftime('%Y%m%d')
+        date_folder = FileHandler.today_folder()
         
         # 创建完整的缓存目录路径
         cache_dir = os.path.join(CACHE_DIR, date_folder, article_type)
-        os.makedirs(cache_dir, exist_ok=True)
+        _ensure_dir(cache_dir)
         
         # 生成文件名
-        url_hash = hashlib.md5(url.encode()).hexdigest()[:10]
+        url_hash = _url_hash(url)
         date_str = str(date).replace('/', '-').replace(' ', '_')[:10] if date else "未知日期"
         title_clean = FileHandler._sanitize_filename(title) if title else "未知标题"
         institution_clean = FileHandler._sanitize_filename(institution) if institution else "未知机构"
@@ -48,6 +109,11 @@ class FileHandler:
         filename = f"{institution_clean}_{date_str}_{title_clean}_{url_hash}.txt"
         return os.path.join(cache_dir, filename)
     
+    @staticmethod
+    def today_folder() -> str:
+        """今天的缓存文件夹名（按日期缓存格式化结果，跨零点运行时自动切换）"""
+        return _date_folder(date.today())
+
     @staticmethod
     def _sanitize_filename(filename: str) -> str:
         """清理文件名"""
@@ -60,30 +126,30 @@ class FileHandler:
 
     @staticmethod
     def check_cache(url: str, date_folder: Optional[str] = None) -> str:
-        """检查缓存是否存在"""
-        url_hash = hashlib.md5(url.encode()).hexdigest()[:10]
+        """检查缓存是否存在（通过内存索引定位文件，不再每次遍历缓存目录）"""
+        url_hash = _url_hash(url)
 
         # 确定搜索路径
         if date_folder:
-            search_path = os.path.join(CACHE_DIR, date_folder)
+            search_path = os.path.join(CACHE_DIR, date_folder) + os.sep
         else:
-            search_path = CACHE_DIR
+            search_path = CACHE_DIR + os.sep
 
-        if os.path.exists(search_path):
-            # 递归搜索所有子目录
-            for root, dirs, files in os.walk(search_path):
-                for file in files:
-                    if url_hash in file:
-                        cache_file = os.path.join(root, file)
-                        with open(cache_file, 'r', encoding='utf-8') as f:
-                            return f.read()
+        for cache_file in _get_cache_index().get(url_hash, ()):
+            if not cache_file.startswith(search_path):
+                continue
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    return f.read()
+            except FileNotFoundError:  # 索引建立后被外部删除
+                continue
 
         return ""
 
     @staticmethod
     def save_cache(content: str, cache_path: str):
         """保存缓存 - 确保内容格式正确"""
-        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        _ensure_dir(os.path.dirname(cache_path))
 
         # 检查内容是否包含元数据
         if not content.startswith('标题:') and '-' * 80 not in content:
@@ -92,7 +158,23 @@ class FileHandler:
 
         with open(cache_path, 'w', encoding='utf-8') as f:
             f.write(content)
+
+        # 索引已建立时加入新文件
+        with _cache_index_lock:
+            if _cache_index is not None:
+                paths = _cache_index.setdefault(_cache_index_key(os.path.basename(cache_path)), [])
+                if cache_path not in paths:
+                    paths.append(cache_path)
     
+    @staticmethod
+    def count_cached_files(type_path: str) -> int:
+        """统计分类文件夹中的缓存文章数（scandir一次读出文件名和类型，文件夹不存在时为0）"""
+        try:
+            with os.scandir(type_path) as entries:
+                return sum(1 for entry in entries if entry.name.endswith('.txt') and entry.is_file())
+        except (FileNotFoundError, NotADirectoryError):
+            return 0
+
     @staticmethod
     def get_cache_statistics(date_folder: Optional[str] = None) -> dict:
         """获取缓存统计信息"""
@@ -116,21 +198,19 @@ class FileHandler:
         # 统计各类型文件数量
         if date_folder:
             # 如果指定了日期，直接查看该日期下的分类文件夹
-            for type_folder in ['固收类', '权益类', '宏观类', '其他']:
-                type_path = os.path.join(search_path, type_folder)
-                if os.path.exists(type_path) and os.path.isdir(type_path):
-                    stats[type_folder] = len([f for f in os.listdir(type_path) if f.endswith('.txt')])
+            for type_folder in ARTICLE_TYPES:
+                stats[type_folder] = FileHandler.count_cached_files(os.path.join(search_path, type_folder))
         else:
             # 遍历所有日期文件夹
-            for date_dir in os.listdir(search_path):
-                date_path = os.path.join(search_path, date_dir)
-                if os.path.isdir(date_path) and date_dir.isdigit() and len(date_dir) == 8:
-                    for type_folder in ['固收类', '权益类', '宏观类', '其他']:
-                        type_path = os.path.join(date_path, type_folder)
-                        if os.path.exists(type_path) and os.path.isdir(type_path):
-                            stats[type_folder] += len([f for f in os.listdir(type_path) if f.endswith('.txt')])
+            with os.scandir(search_path) as date_dirs:
+                for date_dir in date_dirs:
+                    if date_dir.name.isdigit() and len(date_dir.name) == 8 and date_dir.is_dir():
+                        for type_folder in ARTICLE_TYPES:
+                            stats[type_folder] += FileHandler.count_cached_files(
+                                os.path.join(date_dir.path, type_folder)
+                            )
         
-        stats['总计'] = sum(stats[k] for k in ['固收类', '权益类', '宏观类', '其他'])
+        stats['总计'] = sum(stats[k] for k in ARTICLE_TYPES)
         
         return stats
     
@@ -154,6 +234,8 @@ class FileHandler:
                     if (current_date - folder_date).days > days_to_keep:
                         import shutil
                         shutil.rmtree(folder_path)
+                        _ensured_dirs.clear()
+                        _reset_cache_index()
                         cleaned_count += 1
                         print(f"已清理缓存文件夹: {folder}")
                 except ValueError:
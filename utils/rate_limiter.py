@@ -0,0 +1,27 @@
+"""请求频率控制工具"""
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class RateLimiter:
+    """按域名限速 - 同一域名的两次请求之间至少间隔min_interval秒，不同域名互不影响"""
+
+    def __init__(self, min_interval: float = 3.0):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_allowed = {}
+
+    def wait(self, url: str):
+        """等待直到允许向该URL所在域名发起请求（线程安全）"""
+        host = urlparse(url).netloc or url
+
+        # 在锁内预约时间片，锁外休眠，避免阻塞其他域名
+        with self._lock:
+            now = time.monotonic()
+            scheduled = max(now, self._next_allowed.get(host, now))
+            self._next_allowed[host] = scheduled + self.min_interval
+
+        delay = scheduled - now
+        if delay > 0:
+            time.sleep(delay)